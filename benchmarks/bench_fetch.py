@@ -0,0 +1,190 @@
+"""
+Benchmark of karpet's own overhead against the local replay server
+(see ``replay.py``) - no network access needed.
+
+Reports latency (median and 95th percentile), throughput and the peak
+of allocated memory (tracemalloc) of the main fetch methods. The server
+runs in its own process so it doesn't share the GIL nor the traced
+memory with karpet.
+
+    python benchmarks/bench_fetch.py
+    python benchmarks/bench_fetch.py --latency 0.05 --throttle-every 10
+    python benchmarks/bench_fetch.py --fixtures benchmarks/fixtures news
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+
+# Import karpet of this checkout even if it's not installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from karpet import Karpet, RateLimiter  # noqa: E402
+from replay import get_base_urls, get_trend_req_class, synthesize  # noqa: E402
+
+
+class BenchKarpet(Karpet):
+    # Throttled (429) requests are retried right away.
+    req_backoff_factor = 0
+
+
+def get_scenarios():
+    """
+    Returns benchmarked calls.
+
+    :return: Dict where keys are names and values functions taking
+             Karpet instance.
+    :rtype: dict
+    """
+
+    def coin_ids(k):
+        # Force index rebuild.
+        Karpet._coin_ids_index = None
+
+        return k.get_coin_ids("btc")
+
+    def exchanges_many(k):
+        # Force index rebuild.
+        Karpet._exchanges_index = None
+
+        return k.fetch_crypto_exchanges_many([f"C{i}" for i in range(1000)])
+
+    def google_trends(k):
+        k.start = date(2015, 1, 1)
+        k.end = date(2021, 1, 1)
+
+        return k.fetch_google_trends(["bitcoin", "ethereum"], sleeptime=0)
+
+    return {
+        "historical_data": lambda k: k.fetch_crypto_historical_data(id="bitcoin"),
+        "google_trends": google_trends,
+        "news": lambda k: k.fetch_news("BTC"),
+        "top_news": lambda k: k.fetch_top_news(),
+        "basic_info": lambda k: k.get_basic_info(id="bitcoin"),
+        "coin_ids": coin_ids,
+        "exchanges_many": exchanges_many,
+    }
+
+
+def start_server(fixtures, latency, throttle_every):
+    """
+    Starts the replay server in a subprocess and waits for it.
+
+    :param str fixtures: Fixtures directory.
+    :param float latency: Seconds every response is delayed by.
+    :param int throttle_every: Every n-th request is responded with 429.
+    :return: Server process and its URL.
+    :rtype: tuple
+    """
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay.py"),
+            "serve",
+            fixtures,
+            f"--port={port}",
+            f"--latency={latency}",
+            f"--throttle-every={throttle_every}",
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            break
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+    else:
+        process.kill()
+        raise Exception("Replay server didn't start.")
+
+    return process, f"http://127.0.0.1:{port}"
+
+
+def measure(func, k, repeat):
+    """
+    Returns per-call latencies, total time and peak allocated memory
+    of the given function.
+    """
+
+    # Warm up.
+    func(k)
+
+    latencies = []
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        call_start = time.perf_counter()
+        func(k)
+        latencies.append(time.perf_counter() - call_start)
+
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(k)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return np.array(latencies), total, peak
+
+
+def main():
+    scenarios = get_scenarios()
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", choices=[[]] + list(scenarios))
+    parser.add_argument(
+        "--fixtures", help="fixtures directory (synthesized if not set)"
+    )
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures = args.fixtures
+
+        if not fixtures:
+            fixtures = tmp_dir
+            synthesize(fixtures)
+
+        process, base_url = start_server(fixtures, args.latency, args.throttle_every)
+
+        try:
+            k = BenchKarpet(rate_limiter=RateLimiter({}))
+            k.base_urls = get_base_urls(base_url)
+            k.trend_req_class = get_trend_req_class(base_url)
+
+            print(
+                f"{'':>16} {'p50 [ms]':>9} {'p95 [ms]':>9} "
+                f"{'calls/s':>8} {'peak [KiB]':>11}"
+            )
+
+            for name in args.scenarios or scenarios:
+                latencies, total, peak = measure(scenarios[name], k, args.repeat)
+                print(
+                    f"{name:>16} {np.median(latencies) * 1000:>9.2f} "
+                    f"{np.percentile(latencies, 95) * 1000:>9.2f} "
+                    f"{args.repeat / total:>8.1f} {peak / 1024:>11.0f}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark of ``import karpet`` time. Every run is a fresh interpreter.
+
+Reports the best and median import time and the heavy dependencies
+loaded after the import and after the first synchronous request setup.
+Exits with non-zero status if heavy dependencies are imported eagerly
+or (with ``--max-ms``) the median import time is over the limit so it
+can guard against regressions in CI.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --max-ms 100
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = (
+    "aiohttp",
+    "asyncio",
+    "bs4",
+    "lxml",
+    "numpy",
+    "pandas",
+    "pytrends",
+    "requests",
+    "urllib3",
+)
+
+SCRIPT = """
+import json, sys, time
+
+start = time.perf_counter()
+import karpet
+elapsed = time.perf_counter() - start
+
+heavy = {heavy!r}
+imported = [m for m in heavy if m in sys.modules]
+karpet.Karpet().req_ses
+session = [m for m in heavy if m in sys.modules]
+
+print(json.dumps({{"time": elapsed, "imported": imported, "session": session}}))
+"""
+
+
+def run(repeat):
+    """
+    Imports karpet in fresh interpreters.
+
+    :param int repeat: Number of runs.
+    :return: List of run results.
+    :rtype: list
+    """
+
+    script = SCRIPT.format(heavy=HEAVY_MODULES)
+
+    return [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", script],
+                # Import karpet of this checkout even if it's not installed.
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, help="fail if median is over")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    times = [r["time"] * 1000 for r in results]
+    median = statistics.median(times)
+
+    print(f"best   {min(times):>7.1f} ms")
+    print(f"median {median:>7.1f} ms")
+    print(f"imported by 'import karpet': {', '.join(results[0]['imported']) or '-'}")
+    print(f"imported by session setup: {', '.join(results[0]['session']) or '-'}")
+
+    failed = False
+
+    if results[0]["imported"]:
+        print("FAIL: heavy dependencies are imported eagerly")
+        failed = True
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"FAIL: median import time is over {args.max_ms} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
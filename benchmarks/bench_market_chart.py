@@ -0,0 +1,116 @@
+"""
+Benchmark of market chart payload decoding on a synthetic 10-year
+daily series.
+
+Compares ``Karpet._market_chart_to_df()`` with the original decoding
+(one array and one series per field joined by ``pd.concat()``). Reports
+the best time and the peak of allocated memory (tracemalloc).
+
+    python benchmarks/bench_market_chart.py
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Import karpet of this checkout even if it's not installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from karpet import Karpet  # noqa: E402
+
+
+def make_payload(days=3653):
+    """
+    Generates market chart payload the way coingecko.com returns it.
+
+    :param int days: Number of days.
+    :return: Dict with ``prices``, ``market_caps`` and ``total_volumes``.
+    :rtype: dict
+    """
+
+    rng = np.random.default_rng(0)
+    day = 24 * 3600 * 1000
+    start = 1262304000000  # 2010-01-01
+    timestamps = [start + i * day for i in range(days)]
+    prices = np.exp(np.cumsum(rng.normal(0, 0.03, days))) * 100
+
+    return {
+        "prices": [[t, float(p)] for t, p in zip(timestamps, prices)],
+        "market_caps": [[t, float(p * 1e7)] for t, p in zip(timestamps, prices)],
+        "total_volumes": [[t, float(p * 1e5)] for t, p in zip(timestamps, prices)],
+    }
+
+
+def decode_legacy(data):
+    """
+    The original decoding (with ``total_volume`` taken from
+    ``total_volumes`` so the results are comparable).
+    """
+
+    prices = np.array(data["prices"])
+    prices = pd.Series(prices[:, 1], index=prices[:, 0], name="price")
+
+    market_caps = np.array(data["market_caps"])
+    market_caps = pd.Series(
+        market_caps[:, 1], index=market_caps[:, 0], name="market_cap"
+    )
+
+    total_volumes = np.array(data["total_volumes"])
+    total_volumes = pd.Series(
+        total_volumes[:, 1], index=total_volumes[:, 0], name="total_volume"
+    )
+    df = pd.concat([prices, market_caps, total_volumes], axis=1)
+    df.index = pd.to_datetime(df.index, unit="ms")
+    df.index = df.index.normalize()
+
+    return df
+
+
+def measure(func, data, repeat):
+    """
+    Returns result, best time and peak allocated memory of the given function.
+    """
+
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=3653)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    data = make_payload(args.days)
+    k = Karpet()
+
+    expected, legacy_time, legacy_peak = measure(decode_legacy, data, args.repeat)
+    result, new_time, new_peak = measure(k._market_chart_to_df, data, args.repeat)
+
+    assert (expected.index == result.index).all()
+    assert np.allclose(expected.values, result.values)
+
+    print(f"{'':>10} {'time [ms]':>10} {'peak [KiB]':>11}")
+    print(f"{'legacy':>10} {legacy_time * 1000:>10.2f} {legacy_peak / 1024:>11.0f}")
+    print(f"{'columnar':>10} {new_time * 1000:>10.2f} {new_peak / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
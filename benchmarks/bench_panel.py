@@ -0,0 +1,129 @@
+"""
+Benchmark of multi-coin panel assembly on a synthetic universe (coins
+with 10-year daily histories of different lengths).
+
+Compares ``pd.concat()`` of per-coin dataframes (what callers of
+``fetch_crypto_historical_data()`` do) with the panel of
+``Karpet.fetch_crypto_historical_data_panel()`` in float64 and float32.
+Reports the best time, the peak of allocated memory (tracemalloc) and
+the size of the result.
+
+    python benchmarks/bench_panel.py
+    python benchmarks/bench_panel.py --coins 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Import karpet of this checkout even if it's not installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from karpet import Karpet  # noqa: E402
+
+
+def make_frames(coins, days):
+    """
+    Generates per-coin dataframes the way ``fetch_crypto_historical_data()``
+    returns them - newer coins have shorter histories.
+
+    :param int coins: Number of coins.
+    :param int days: Max number of days.
+    :return: Dict of dataframes by coin ID.
+    :rtype: dict
+    """
+
+    rng = np.random.default_rng(0)
+    end = pd.Timestamp("2021-01-01")
+    frames = {}
+
+    for i in range(coins):
+        n = int(rng.integers(days // 10, days + 1))
+        prices = np.exp(np.cumsum(rng.normal(0, 0.03, n))) * 100
+        frames[f"coin-{i}"] = pd.DataFrame(
+            {"price": prices, "market_cap": prices * 1e7, "total_volume": prices * 1e5},
+            index=pd.date_range(end=end, periods=n, freq="D"),
+        )
+
+    return frames
+
+
+def assemble_concat(frames):
+    return pd.concat(frames, axis=1, sort=True).swaplevel(axis=1).sort_index(axis=1)
+
+
+def assemble_panel(frames, dtype):
+    k = Karpet()
+
+    return k._get_panel(
+        {id: k._get_panel_coin(df, dtype) for id, df in frames.items()}, dtype
+    )
+
+
+def measure(func, repeat):
+    """
+    Returns result, best time and peak allocated memory of the given function.
+    """
+
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--coins", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3653)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = make_frames(args.coins, args.days)
+
+    print(f"{'':>16} {'time [ms]':>10} {'peak [MiB]':>11} {'size [MiB]':>11}")
+
+    expected = None
+
+    for name, func in (
+        ("concat", lambda: assemble_concat(frames)),
+        ("panel float64", lambda: assemble_panel(frames, "float64")),
+        ("panel float32", lambda: assemble_panel(frames, "float32")),
+    ):
+        result, best, peak = measure(func, args.repeat)
+        size = result.memory_usage(index=True, deep=True).sum()
+
+        if expected is None:
+            expected = result
+        else:
+            assert (expected.index == result.index).all()
+            assert np.allclose(
+                expected["price"].values,
+                result["price"][expected["price"].columns].values,
+                equal_nan=True,
+                rtol=1e-6,
+            )
+
+        print(
+            f"{name:>16} {best * 1000:>10.0f} {peak / 2**20:>11.0f} "
+            f"{size / 2**20:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
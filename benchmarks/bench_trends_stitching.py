@@ -0,0 +1,129 @@
+"""
+Benchmark of Google trends batches stitching on synthetic searches.
+
+Compares ``karpet.utils.stitch_trend_batches()`` with the original
+merge/concat based stitching loop of ``Karpet.fetch_google_trends()``.
+
+    python benchmarks/bench_trends_stitching.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Import karpet of this checkout even if it's not installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from karpet.utils import stitch_trend_batches  # noqa: E402
+
+KW_LIST = ["bitcoin", "ethereum"]
+
+
+def make_batches(count, trdays=250, overlap=100, seed=0):
+    """
+    Generates overlapping searches (newest first) the way Google returns
+    them - every search is scaled so its maximum is 100 and rounded.
+
+    :param int count: Number of searches.
+    :param int trdays: Days in one search.
+    :param int overlap: Overlapped days of two searches.
+    :param int seed: Random seed.
+    :return: List of dataframes.
+    :rtype: list
+    """
+
+    rng = np.random.default_rng(seed)
+    step = trdays - overlap
+    n_days = step * (count - 1) + trdays + 1
+    end = pd.Timestamp("2020-01-01")
+    dates = pd.date_range(end=end, periods=n_days, freq="D", name="date")
+    series = np.exp(np.cumsum(rng.normal(0, 0.05, (n_days, len(KW_LIST))), axis=0))
+    batches = []
+
+    for i in range(count):
+        stop = n_days - i * step
+        values = series[stop - trdays - 1 : stop]
+        values = np.maximum(np.round(100 * values / values.max()), 1)
+        df = pd.DataFrame(values, columns=KW_LIST)
+        df.insert(0, "date", dates[stop - trdays - 1 : stop])
+        df["isPartial"] = False
+        batches.append(df)
+
+    return batches
+
+
+def stitch_legacy(batches, kw_list):
+    """
+    The original stitching loop - every batch is merged with and
+    appended to the whole already stitched dataframe.
+    """
+
+    df = batches[0]
+
+    for temp_trend in batches[1:]:
+        temp_trend = temp_trend.merge(df, on="date", how="left")
+
+        for kw in kw_list:
+            norm_factor = np.ma.masked_invalid(
+                temp_trend[kw + "_y"] / temp_trend[kw + "_x"]
+            ).mean()
+            temp_trend[kw] = temp_trend[kw + "_x"] * norm_factor
+
+        temp_trend = temp_trend[temp_trend.isnull().any(axis=1)]
+        temp_trend["isPartial"] = temp_trend["isPartial_x"]
+        df = pd.concat(
+            [df, temp_trend[["date", "isPartial"] + kw_list]], axis=0, sort=False
+        )
+
+    return df[["date"] + kw_list].sort_values("date").reset_index(drop=True)
+
+
+def measure(func, *args, repeat=3):
+    """
+    Returns result of the given function and the best time of
+    ``repeat`` runs.
+    """
+
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'windows':>8} {'legacy [ms]':>12} {'vectorized [ms]':>16} {'speedup':>8}")
+
+    for count in args.counts:
+        batches = make_batches(count)
+        expected, legacy_time = measure(
+            stitch_legacy, batches, KW_LIST, repeat=args.repeat
+        )
+        result, new_time = measure(
+            stitch_trend_batches, batches, KW_LIST, repeat=args.repeat
+        )
+
+        assert (expected["date"].values == result["date"].values).all()
+        assert np.allclose(expected[KW_LIST].values, result[KW_LIST].values)
+
+        print(
+            f"{count:>8} {legacy_time * 1000:>12.1f} {new_time * 1000:>16.1f}"
+            f" {legacy_time / new_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
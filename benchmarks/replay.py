@@ -0,0 +1,593 @@
+"""
+Local replay server which stands in for the services karpet talks to
+(coingecko.com, cryptocompare.com, coincodex.com, cointelegraph.com,
+coinmarketcap.com quick search and a Google trends stub) so karpet
+can be measured without network access.
+
+Fixtures are files in a directory laid out by host and URL path
+(query is ignored), i.e.::
+
+    api.coingecko.com/api/v3/coins/bitcoin/market_chart.json
+    cointelegraph.com/news/some-article.html
+    cointelegraph.com/index.html
+
+Fixtures can be either recorded from the live services or synthesized:
+
+    python benchmarks/replay.py record benchmarks/fixtures
+    python benchmarks/replay.py synthesize benchmarks/fixtures
+    python benchmarks/replay.py serve benchmarks/fixtures --latency 0.05
+
+Point karpet to the server by ``Karpet.base_urls`` (and use
+``Karpet.trend_req_class`` for Google trends):
+
+.. code-block:: python
+
+    with ReplayServer("benchmarks/fixtures", latency=0.05) as server:
+        k = Karpet()
+        k.base_urls = server.base_urls
+        k.trend_req_class = server.trend_req_class
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+HOSTS = (
+    "api.coingecko.com",
+    "min-api.cryptocompare.com",
+    "coincodex.com",
+    "cointelegraph.com",
+    "s2.coinmarketcap.com",
+    "trends.google.com",
+)
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:69.0) Gecko/20100101 Firefox/69.0"
+
+# Live URLs recorded by ``record()``.
+RECORDED_URLS = (
+    "https://api.coingecko.com/api/v3/coins/list",
+    "https://api.coingecko.com/api/v3/coins/bitcoin",
+    "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?vs_currency=usd&days=max",
+    "https://api.coingecko.com/api/v3/coins/bitcoin/ohlc?vs_currency=usd&days=1",
+    "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&price_change_percentage=1y",
+    "https://min-api.cryptocompare.com/data/v4/all/exchanges?fsym=BTC",
+    "https://coincodex.com/api/coincodexicos/get_news/BTC/10/1/",
+    "https://cointelegraph.com/",
+    "https://s2.coinmarketcap.com/generated/search/quick_search.json",
+)
+
+
+def get_fixture_file(path, url):
+    """
+    Returns fixture file path for the given URL.
+
+    :param str path: Fixtures directory.
+    :param str url: URL (query is ignored).
+    :return: File path without extension if the URL path has none.
+    :rtype: str
+    """
+
+    parts = urlsplit(url)
+    url_path = parts.path.strip("/") or "index"
+
+    return os.path.join(path, parts.hostname, *url_path.split("/"))
+
+
+def write_fixture(file, content, ext):
+    """
+    Writes the given fixture file.
+
+    :param str file: File path (see ``get_fixture_file()``).
+    :param bytes content: File content.
+    :param str ext: Extension added if the file has none (".json", ".html").
+    """
+
+    if not os.path.splitext(file)[1]:
+        file += ext
+
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+
+    with open(file, "wb") as f:
+        f.write(content)
+
+
+def record(path, urls=RECORDED_URLS, news=10):
+    """
+    Records fixtures from the live services including news pages
+    of the recorded news and top news.
+
+    :param str path: Fixtures directory.
+    :param list urls: URLs to be recorded.
+    :param int news: Max number of news pages recorded per news list.
+    """
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    pages = []
+
+    for url in urls:
+        response = session.get(url)
+        response.raise_for_status()
+        ext = ".json" if "json" in response.headers.get("Content-Type", "") else ".html"
+        write_fixture(get_fixture_file(path, url), response.content, ext)
+
+        if "/get_news/" in url:
+            pages += [n["url"] for n in response.json()[:news]]
+
+    for url in pages:
+        response = session.get(url)
+
+        if response.ok:
+            write_fixture(get_fixture_file(path, url), response.content, ".html")
+
+
+def synthesize(path, coins=10000, days=3653, news=20, seed=0):
+    """
+    Writes synthetic fixtures of realistic shape and size - for benchmarking
+    without recorded fixtures.
+
+    :param str path: Fixtures directory.
+    :param int coins: Number of coins in the coin list.
+    :param int days: Number of days of bitcoin market chart.
+    :param int news: Number of news (news list and top news).
+    :param int seed: Random generator seed.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    def write_json(url, data):
+        file = get_fixture_file(path, url)
+        write_fixture(file, json.dumps(data).encode(), ".json")
+
+    # Coins.
+    coin_list = [
+        {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+        {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    ]
+    coin_list += [
+        {"id": f"coin-{i}", "symbol": f"c{i % 3000}", "name": f"Coin {i}"}
+        for i in range(coins - len(coin_list))
+    ]
+    write_json("https://api.coingecko.com/api/v3/coins/list", coin_list)
+
+    # Market chart - daily points and current point.
+    day = 24 * 3600 * 1000
+    now = int(time.time() * 1000)
+    timestamps = [now - (days - i) * day for i in range(days)] + [now]
+    prices = np.exp(np.cumsum(rng.normal(0, 0.03, len(timestamps)))) * 100
+    chart = {
+        "prices": [[t, float(p)] for t, p in zip(timestamps, prices)],
+        "market_caps": [[t, float(p * 1e7)] for t, p in zip(timestamps, prices)],
+        "total_volumes": [[t, float(p * 1e5)] for t, p in zip(timestamps, prices)],
+    }
+
+    for url in (
+        "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart",
+        "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range",
+    ):
+        write_json(url, chart)
+
+    # OHLC - 30 minute candles of the last day.
+    write_json(
+        "https://api.coingecko.com/api/v3/coins/bitcoin/ohlc",
+        [
+            [now - (48 - i) * 1800 * 1000] + [float(p)] * 4
+            for i, p in enumerate(prices[-48:])
+        ],
+    )
+
+    # Coin detail.
+    write_json(
+        "https://api.coingecko.com/api/v3/coins/bitcoin",
+        {
+            "id": "bitcoin",
+            "name": "Bitcoin",
+            "description": {"en": "Lorem ipsum. " * 500},
+            "market_data": {
+                "current_price": {"usd": float(prices[-1])},
+                "market_cap": {"usd": int(prices[-1] * 1e7)},
+                "market_cap_rank": 1,
+                "price_change_24h": float(prices[-1] - prices[-2]),
+                "price_change_percentage_24h": float(
+                    100 * (prices[-1] / prices[-2] - 1)
+                ),
+            },
+            "community_data": {
+                "reddit_average_posts_48h": 5.5,
+                "reddit_average_comments_48h": 250.75,
+                "reddit_subscribers": 4000000,
+                "reddit_accounts_active_48h": 9000,
+            },
+            "developer_data": {
+                "forks": 35000,
+                "stars": 70000,
+                "total_issues": 7000,
+                "closed_issues": 6500,
+                "pull_request_contributors": 800,
+                "commit_count_4_weeks": 300,
+            },
+        },
+    )
+
+    # Markets - one page.
+    write_json(
+        "https://api.coingecko.com/api/v3/coins/markets",
+        [
+            {
+                "id": c["id"],
+                "symbol": c["symbol"],
+                "name": c["name"],
+                "current_price": float(p),
+                "market_cap": int(p * 1e7),
+                "market_cap_rank": i + 1,
+                "price_change_24h": 0.5,
+                "price_change_percentage_24h": 1.5,
+                "price_change_percentage_1y_in_currency": 50.0,
+            }
+            for i, (c, p) in enumerate(zip(coin_list[:250], prices))
+        ],
+    )
+
+    # Exchanges - every one lists BTC and a random part of the coins
+    # (the same payload is served with and without "fsym" query).
+    symbols = sorted({c["symbol"].upper() for c in coin_list} - {"BTC"})
+    write_json(
+        "https://min-api.cryptocompare.com/data/v4/all/exchanges",
+        {
+            "Response": "Success",
+            "Data": {
+                "exchanges": {
+                    f"Exchange{i}": {
+                        "isActive": True,
+                        "pairs": {
+                            s: {"tsyms": {"USD": {}, "BTC": {}}}
+                            for s in ["BTC"]
+                            + list(
+                                rng.choice(
+                                    symbols,
+                                    min(int(rng.integers(10, 500)), len(symbols)),
+                                    replace=False,
+                                )
+                            )
+                        },
+                    }
+                    for i in range(200)
+                }
+            },
+        },
+    )
+
+    # Quick search.
+    write_json(
+        "https://s2.coinmarketcap.com/generated/search/quick_search.json",
+        [
+            {
+                "name": c["name"],
+                "symbol": c["symbol"].upper(),
+                "rank": i + 1,
+                "slug": c["id"],
+                "tokens": [c["name"], c["id"], c["symbol"].upper()],
+                "id": i + 1,
+            }
+            for i, c in enumerate(coin_list)
+        ],
+    )
+
+    # News - list, article pages and front page.
+    urls = [f"https://cointelegraph.com/news/article-{i}" for i in range(news)]
+    write_json(
+        "https://coincodex.com/api/coincodexicos/get_news/BTC/10/1/",
+        [{"url": u} for u in urls],
+    )
+    published = datetime(2021, 1, 1)
+
+    for i, url in enumerate(urls):
+        head = (
+            f'<meta property="og:title" content="Article {i}">'
+            f'<meta property="og:description" content="Description of article {i}.">'
+            f'<meta property="og:image" content="https://cointelegraph.com/{i}.png">'
+            '<meta property="article:published_time" content="'
+            f'{(published + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S")}+00:00">'
+        )
+        body = f"<p>{'Lorem ipsum dolor sit amet. ' * 20}</p>" * 200
+        write_fixture(
+            get_fixture_file(path, url),
+            f"<html><head>{head}</head><body>{body}</body></html>".encode(),
+            ".html",
+        )
+
+    items = "".join(f'<li><a href="{urlsplit(u).path}">{u}</a></li>' for u in urls)
+    html = (
+        f'<html><body><ul class="main-news-controls__list">{items}</ul></body></html>'
+    )
+    write_fixture(
+        get_fixture_file(path, "https://cointelegraph.com/"), html.encode(), ".html"
+    )
+
+
+def get_trends(kw_list, timeframe):
+    """
+    Google trends stub data - deterministic daily interest in the
+    given timeframe scaled to 0 - 100 within the timeframe like Google
+    does it.
+
+    :param list kw_list: List of search terms.
+    :param str timeframe: Dates "YYYY-MM-DD YYYY-MM-DD".
+    :return: Dict with ``date`` list (ISO dates) and one list per keyword.
+    :rtype: dict
+    """
+
+    start, end = (date.fromisoformat(d) for d in timeframe.split())
+    days = np.arange(start.toordinal(), end.toordinal() + 1)
+    data = {"date": [date.fromordinal(int(d)).isoformat() for d in days]}
+    raw = {
+        kw: 50 + 40 * np.sin(days / (30 + 7 * i)) + days / 1000
+        for i, kw in enumerate(kw_list)
+    }
+    top = max(v.max() for v in raw.values())
+
+    for kw, values in raw.items():
+        data[kw] = np.round(100 * values / top).astype(int).tolist()
+
+    return data
+
+
+def get_base_urls(base_url):
+    """
+    Returns host -> base URL dict for ``Karpet.base_urls``.
+
+    :param str base_url: Replay server URL.
+    :return: Dict where keys are hosts and values base URLs.
+    :rtype: dict
+    """
+
+    return {host: f"{base_url}/{host}" for host in HOSTS}
+
+
+def get_trend_req_class(base_url):
+    """
+    Returns Google trends client class for ``Karpet.trend_req_class``.
+
+    :param str base_url: Replay server URL.
+    :return: ``ReplayTrendReq`` subclass bound to the server.
+    :rtype: type
+    """
+
+    attrs = {"base_url": f"{base_url}/trends.google.com"}
+
+    return type("ReplayTrendReq", (ReplayTrendReq,), attrs)
+
+
+class ReplayTrendReq:
+    """
+    pytrends ``TrendReq`` compatible Google trends client which fetches
+    stub data from the replay server. See ``ReplayServer.trend_req_class``.
+    """
+
+    base_url = None
+
+    def __init__(self, hl="en-US", tz=360, retries=0, backoff_factor=0, **kwargs):
+        # Retries the same way as pytrends.
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 504),
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(max_retries=retry))
+        self.kw_list = None
+        self.timeframe = None
+
+    def build_payload(self, kw_list, cat=0, timeframe="today 5-y", geo="", gprop=""):
+        self.kw_list = kw_list
+        self.timeframe = timeframe
+
+    def interest_over_time(self):
+        response = self.session.get(
+            f"{self.base_url}/trends/api/widgetdata/multiline",
+            params={"kw": ",".join(self.kw_list), "timeframe": self.timeframe},
+        )
+        response.raise_for_status()
+        data = response.json()
+        df = pd.DataFrame(
+            {kw: data[kw] for kw in self.kw_list},
+            index=pd.DatetimeIndex(pd.to_datetime(data["date"]), name="date"),
+        )
+        df["isPartial"] = False
+
+        return df
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Serves fixtures of ``server.path`` - see the module docstring.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are sent separately - don't wait for delayed ACKs.
+    disable_nagle_algorithm = True
+    content_types = {
+        ".json": "application/json",
+        ".html": "text/html; charset=utf-8",
+    }
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        host, _, url_path = parts.path.lstrip("/").partition("/")
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.should_throttle():
+            return self.send_content(429, b"", ".json", {"Retry-After": "0"})
+
+        if "trends.google.com" == host:
+            query = parse_qs(parts.query)
+            data = get_trends(query["kw"][0].split(","), query["timeframe"][0])
+
+            return self.send_content(200, json.dumps(data).encode(), ".json")
+
+        file = get_fixture_file(server.path, f"https://{host}/{url_path}")
+
+        for name in (file, file + ".json", file + ".html"):
+            if os.path.isfile(name):
+                with open(name, "rb") as f:
+                    content = f.read()
+
+                return self.send_content(200, content, os.path.splitext(name)[1])
+
+        self.send_content(404, b"", ".json")
+
+    def send_content(self, status, content, ext, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", self.content_types.get(ext, "text/plain"))
+        self.send_header("Content-Length", str(len(content)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local HTTP server serving fixtures with injectable latency
+    and rate limiting (429) responses. Runs in a background thread.
+    """
+
+    daemon_threads = True
+    # Default backlog (5) makes concurrent clients wait for SYN retransmits.
+    request_queue_size = 128
+
+    def __init__(self, path, latency=0, throttle_every=0, port=0):
+        """
+        Constructor.
+
+        :param str path: Fixtures directory.
+        :param float latency: Seconds every response is delayed by.
+        :param int throttle_every: Every n-th request is responded with 429
+                                   (0 = never).
+        :param int port: Port to listen on (0 = any free port).
+        """
+
+        super().__init__(("127.0.0.1", port), ReplayHandler)
+        self.path = path
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops serving and closes the socket.
+        """
+
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def should_throttle(self):
+        """
+        Counts the request and decides if it's responded with 429.
+
+        :return: True if the request is throttled.
+        :rtype: bool
+        """
+
+        with self._lock:
+            self.requests += 1
+            throttle = (
+                bool(self.throttle_every) and 0 == self.requests % self.throttle_every
+            )
+
+            if throttle:
+                self.throttled += 1
+
+        return throttle
+
+    def handle_error(self, request, client_address):
+        # Clients closing connections early (i.e. after reading just
+        # the news page head) are expected.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def base_urls(self):
+        """
+        Host -> base URL dict for ``Karpet.base_urls``.
+        """
+
+        return get_base_urls(self.base_url)
+
+    @property
+    def trend_req_class(self):
+        """
+        Google trends client class for ``Karpet.trend_req_class``.
+        """
+
+        return get_trend_req_class(self.base_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=("record", "synthesize", "serve"))
+    parser.add_argument("path", help="fixtures directory")
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if "record" == args.command:
+        record(args.path)
+    elif "synthesize" == args.command:
+        synthesize(args.path)
+    else:
+        server = ReplayServer(args.path, args.latency, args.throttle_every, args.port)
+        print(f"Serving {args.path} at {server.base_url}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
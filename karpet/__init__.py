@@ -1 +1,7 @@
+from .aio import AsyncKarpet  # noqa
+from .breaker import CircuitBreaker  # noqa
+from .cache import DiskCache, MemoryCache, NewsCache  # noqa
 from .core import Karpet  # noqa
+from .ratelimit import RateLimiter  # noqa
+from .stats import Stats  # noqa
+from .store import HistoryStore  # noqa
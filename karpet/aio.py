@@ -0,0 +1,501 @@
+import functools
+
+from .core import Karpet
+
+
+class AsyncKarpet(Karpet):
+    """
+    Asynchronous variant of Karpet for applications which already
+    run an event loop. Every public method is a coroutine.
+
+    All requests share one pooled aiohttp session with keep-alive
+    connections for the whole lifetime of the instance so either use
+    the instance as async context manager or call ``close()``.
+
+    .. code-block:: python
+
+        async with AsyncKarpet() as k:
+            df = await k.fetch_crypto_historical_data(id="bitcoin")
+    """
+
+    def __init__(self, *args, connections=100, keepalive_timeout=30, **kwargs):
+        """
+        Constructor. Takes the same params as ``Karpet`` and
+        following ones.
+
+        :param int connections: Max number of simultaneous connections.
+        :param float keepalive_timeout: Seconds idle connections are kept open.
+        """
+
+        super().__init__(*args, **kwargs)
+        self.connections = connections
+        self.keepalive_timeout = keepalive_timeout
+        self._aio_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the pooled session.
+        """
+
+        if self._aio_session:
+            await self._aio_session.close()
+            self._aio_session = None
+
+    async def get_quick_search_data(self):
+        """
+        See ``Karpet.get_quick_search_data()``.
+        """
+
+        if not self.quick_search_data:
+            self.quick_search_data = await self._get_json_async(
+                self._get_aio_session(),
+                "https://s2.coinmarketcap.com/generated/search/quick_search.json",
+            )
+
+        return self.quick_search_data
+
+    async def search_coins(self, query, limit=10, fuzzy=False):
+        """
+        See ``Karpet.search_coins()``.
+        """
+
+        return self._get_search_index(await self.get_quick_search_data()).search(
+            query, limit, fuzzy
+        )
+
+    async def fetch_crypto_historical_data(self, symbol=None, id=None):
+        """
+        See ``Karpet.fetch_crypto_historical_data()``.
+        """
+
+        id = await self._get_coin_id_from_params_async(symbol, id)
+        url, stored = await self._run_store_async(self._get_historical_data_request, id)
+        data = await self._get_json_async(self._get_aio_session(), url)
+
+        return await self._run_store_async(
+            self._get_historical_data_df, id, data, stored
+        )
+
+    async def fetch_crypto_historical_data_many(
+        self, symbols=None, ids=None, concurrency=10, long_format=False
+    ):
+        """
+        See ``Karpet.fetch_crypto_historical_data_many()``.
+        """
+
+        import pandas as pd
+
+        frames, errors = await self._fetch_historical_data_many_async(
+            symbols, ids, concurrency
+        )
+
+        if long_format:
+            if frames:
+                frames = pd.concat(
+                    [df.assign(id=id) for id, df in frames.items()], axis=0
+                )[["id", "price", "market_cap", "total_volume"]]
+            else:
+                frames = pd.DataFrame(
+                    columns=["id", "price", "market_cap", "total_volume"]
+                )
+
+        return frames, errors
+
+    async def fetch_crypto_historical_data_panel(
+        self, symbols=None, ids=None, concurrency=10, dtype="float64"
+    ):
+        """
+        See ``Karpet.fetch_crypto_historical_data_panel()``.
+        """
+
+        coins, errors = await self._fetch_historical_data_many_async(
+            symbols, ids, concurrency, lambda df: self._get_panel_coin(df, dtype)
+        )
+
+        return self._get_panel(coins, dtype), errors
+
+    async def fetch_crypto_live_data(self, symbol=None, id=None):
+        """
+        See ``Karpet.fetch_crypto_live_data()``.
+        """
+
+        id = await self._get_coin_id_from_params_async(symbol, id)
+        data = await self._get_json_async(
+            self._get_aio_session(),
+            f"https://api.coingecko.com/api/v3/coins/{id}/ohlc?vs_currency=usd&days=1",
+        )
+
+        return self._ohlc_to_df(data)
+
+    async def stream_crypto_live_data(
+        self, symbols=None, ids=None, interval=60, workers=None
+    ):
+        """
+        See ``Karpet.stream_crypto_live_data()``. This is an async generator
+        - coins are polled concurrently on the event loop, at most ``workers``
+        (defaults to ``connections``) at once.
+
+        .. code-block:: python
+
+            async for df, errors in k.stream_crypto_live_data(ids=["bitcoin"]):
+                print(df)
+        """
+
+        import asyncio
+
+        if (not symbols and not ids) or (symbols and ids):
+            raise AttributeError('Please hand "symbols" or "ids" param.')
+
+        errors = {}
+
+        # Resolve symbols to IDs.
+        if symbols:
+            ids = []
+
+            for symbol in symbols:
+                try:
+                    ids.append(await self._get_coin_id_from_params_async(symbol))
+                except Exception as e:
+                    errors[symbol] = e
+
+        loop = asyncio.get_running_loop()
+        last_rows = {}  # Coin ID -> last yielded row.
+        semaphore = asyncio.Semaphore(workers or self.connections)
+
+        async def poll(id):
+            async with semaphore:
+                data = await self._get_json_async(
+                    self._get_aio_session(),
+                    f"https://api.coingecko.com/api/v3/coins/{id}/ohlc"
+                    "?vs_currency=usd&days=1",
+                )
+
+            return self._get_ohlc_delta(data, last_rows.get(id))
+
+        next_poll = loop.time()
+
+        while True:
+            deltas = {}
+
+            for id, result in zip(
+                ids,
+                await asyncio.gather(*[poll(id) for id in ids], return_exceptions=True),
+            ):
+                if isinstance(result, Exception):
+                    errors[id] = result
+                elif result:
+                    deltas[id] = result
+                    last_rows[id] = result[-1]
+
+            if deltas or errors:
+                yield self._ohlc_deltas_to_df(deltas), errors
+
+            # Nothing to poll.
+            if not ids:
+                return
+
+            errors = {}
+
+            # Sleep until the next scheduled poll - overdue one (slow
+            # poll or consumer) is made right away.
+            next_poll = max(next_poll + interval, loop.time())
+            await asyncio.sleep(next_poll - loop.time())
+
+    async def fetch_crypto_exchanges(self, symbol=None):
+        """
+        See ``Karpet.fetch_crypto_exchanges()``.
+        """
+
+        index = self._get_fresh_exchanges_index()
+
+        if index is not None:
+            return list(index[0].get(symbol.upper(), ()))
+
+        response_data = await self._get_json_async(
+            self._get_aio_session(),
+            f"https://min-api.cryptocompare.com/data/v4/all/exchanges?fsym={symbol}",
+        )
+
+        return self._exchanges_from_data(response_data)
+
+    async def fetch_crypto_exchanges_many(self, symbols):
+        """
+        See ``Karpet.fetch_crypto_exchanges_many()``.
+        """
+
+        index = (await self._get_exchanges_index_async())[0]
+
+        return {s: list(index.get(s.upper(), ())) for s in symbols}
+
+    async def fetch_exchange_symbols(self, exchange):
+        """
+        See ``Karpet.fetch_exchange_symbols()``.
+        """
+
+        return list((await self._get_exchanges_index_async())[1].get(exchange, ()))
+
+    async def fetch_google_trends(self, *args, **kwargs):
+        """
+        See ``Karpet.fetch_google_trends()``. Google trends are
+        fetched by pytrends (which is synchronous) in a worker thread.
+        """
+
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(super().fetch_google_trends, *args, **kwargs)
+        )
+
+    async def fetch_news(self, symbol, limit=10):
+        """
+        See ``Karpet.fetch_news()``.
+        """
+
+        session = self._get_aio_session()
+        data = await self._get_json_async(
+            session,
+            f"https://coincodex.com/api/coincodexicos/get_news/{symbol}/{limit}/1/",
+        )
+        news = [{"url": d["url"]} for d in data]
+        await self._fetch_news_features(news, session)
+
+        return self._drop_bad_news(news)[:limit]
+
+    async def fetch_top_news(self):
+        """
+        See ``Karpet.fetch_top_news()``.
+        """
+
+        return await self._fetch_top_news(self._get_aio_session())
+
+    async def get_coin_ids(self, symbol):
+        """
+        See ``Karpet.get_coin_ids()``.
+        """
+
+        return list((await self._get_coin_ids_index_async()).get(symbol.upper(), ()))
+
+    async def get_coin_ids_many(self, symbols):
+        """
+        See ``Karpet.get_coin_ids_many()``.
+        """
+
+        index = await self._get_coin_ids_index_async()
+
+        return {s: list(index.get(s.upper(), ())) for s in symbols}
+
+    async def get_basic_info(self, symbol=None, id=None):
+        """
+        See ``Karpet.get_basic_info()``.
+        """
+
+        import asyncio
+
+        id = await self._get_coin_id_from_params_async(symbol, id)
+        session = self._get_aio_session()
+        data, data_chart = await asyncio.gather(
+            self._get_json_async(
+                session, f"https://api.coingecko.com/api/v3/coins/{id}"
+            ),
+            self._get_json_async(
+                session,
+                f"https://api.coingecko.com/api/v3/coins/{id}/market_chart?vs_currency=usd&days=365",
+            ),
+        )
+
+        return self._basic_info_from_data(data, data_chart)
+
+    async def get_basic_info_many(self, symbols=None, ids=None, top=None):
+        """
+        See ``Karpet.get_basic_info_many()``. All requests are made
+        concurrently.
+        """
+
+        import asyncio
+
+        if symbols and not ids and not top:
+            await self._get_coin_ids_index_async()
+
+        session = self._get_aio_session()
+        pages = await asyncio.gather(
+            *[
+                self._get_json_async(session, url)
+                for url in self._get_basic_info_many_urls(symbols, ids, top)
+            ]
+        )
+
+        return self._basic_info_many_from_pages(pages, top)
+
+    async def map(self, method, symbols=None, ids=None, workers=None, **kwargs):
+        """
+        See ``Karpet.map()``. Coins are processed concurrently on the event
+        loop - at most ``workers`` (defaults to ``connections``) at once.
+        """
+
+        import asyncio
+
+        if (not symbols and not ids) or (symbols and ids):
+            raise AttributeError('Please hand "symbols" or "ids" param.')
+
+        if isinstance(method, str):
+            method = getattr(self, method)
+
+        keys = symbols or ids
+        param = "symbol" if symbols else "id"
+        semaphore = asyncio.Semaphore(workers or self.connections)
+
+        async def call(key):
+            async with semaphore:
+                return await method(**{param: key}, **kwargs)
+
+        results = {}
+        errors = {}
+
+        for key, result in zip(
+            keys,
+            await asyncio.gather(*[call(k) for k in keys], return_exceptions=True),
+        ):
+            if isinstance(result, Exception):
+                errors[key] = result
+            else:
+                results[key] = result
+
+        return results, errors
+
+    async def _fetch_historical_data_many_async(
+        self, symbols, ids, concurrency, convert=None
+    ):
+        """
+        Asynchronous counterpart of ``Karpet._fetch_historical_data_many()``.
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int concurrency: Max number of concurrent requests.
+        :param callable convert: Optional function every coin dataframe is
+                                 converted by right after it's downloaded.
+        :raises AttributeError: If symbols and ids params are empty.
+        :return: Tuple where first is dict of (converted) dataframes by coin
+                 ID and second is dict of errors (by coin symbol or ID).
+        :rtype: tuple
+        """
+
+        import asyncio
+
+        if (not symbols and not ids) or (symbols and ids):
+            raise AttributeError('Please hand "symbols" or "ids" param.')
+
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(symbol, id):
+            async with semaphore:
+                id = await self._get_coin_id_from_params_async(symbol, id)
+                df = await self.fetch_crypto_historical_data(id=id)
+
+            return id, convert(df) if convert else df
+
+        keys = symbols or ids
+        results = await asyncio.gather(
+            *[fetch_one(k, None) if symbols else fetch_one(None, k) for k in keys],
+            return_exceptions=True,
+        )
+        frames = {}
+        errors = {}
+
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                errors[key] = result
+            else:
+                id, df = result
+                frames[id] = df
+
+        return frames, errors
+
+    def _get_aio_session(self):
+        """
+        Returns the pooled session. The session is created lazily
+        as it has to be created within a running event loop.
+
+        :return: Session instance.
+        :rtype: aiohttp.ClientSession
+        """
+
+        import aiohttp
+
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.connections, keepalive_timeout=self.keepalive_timeout
+                )
+            )
+
+        return self._aio_session
+
+    async def _get_coin_ids_index_async(self):
+        """
+        Asynchronous counterpart of ``Karpet._get_coin_ids_index()``.
+
+        :return: Dict where keys are upper-cased symbols and values tuples of ID's.
+        :rtype: dict
+        """
+
+        index = self._get_fresh_coin_ids_index()
+
+        if index is None:
+            response_data = await self._get_json_async(
+                self._get_aio_session(), "https://api.coingecko.com/api/v3/coins/list"
+            )
+
+            # Not locked - the lock may be held by a sync download and
+            # the index is published at once anyway.
+            index = self._set_coin_ids_index(response_data)
+
+        return index
+
+    async def _get_exchanges_index_async(self):
+        """
+        Asynchronous counterpart of ``Karpet._get_exchanges_index()``.
+
+        :return: Tuple where first is dict of upper-cased symbol -> tuple
+                 of exchanges and second dict of exchange -> tuple of symbols.
+        :rtype: tuple
+        """
+
+        index = self._get_fresh_exchanges_index()
+
+        if index is None:
+            response_data = await self._get_json_async(
+                self._get_aio_session(),
+                "https://min-api.cryptocompare.com/data/v4/all/exchanges",
+            )
+
+            # See _get_coin_ids_index_async().
+            index = self._set_exchanges_index(response_data)
+
+        return index
+
+    async def _get_coin_id_from_params_async(self, symbol=None, id=None):
+        """
+        Asynchronous counterpart of ``Karpet._get_coin_id_from_params()``.
+
+        :param str symbol: Coin symbol - i.e. BTC, ETH, ...
+        :param str id: Coin ID (baed on coingecko.com).
+        :raises AttributeError: If symbol and id params are empty.
+        :return: Coin ID.
+        :rtype: str
+        """
+
+        # Make sure the symbol index is ready so it's not downloaded
+        # synchronously.
+        if symbol and not id:
+            await self._get_coin_ids_index_async()
+
+        return self._get_coin_id_from_params(symbol, id)
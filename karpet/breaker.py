@@ -0,0 +1,104 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class CircuitBreaker:
+    """
+    Thread-safe per-host circuit breaker. Once ``failure_threshold``
+    requests to a host fail in a row the circuit opens and requests
+    to the host fail fast (or are served from stale cache) for
+    ``reset_timeout`` seconds. Then one trial request per
+    ``reset_timeout`` is let through (half-open) - its success closes
+    the circuit again.
+    """
+
+    failure_threshold = 5
+    reset_timeout = 30  # Seconds.
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        """
+        Constructor.
+
+        :param int failure_threshold: Number of failures in a row which opens
+                                      the circuit. Defaults to ``failure_threshold``.
+        :param float reset_timeout: Seconds before a trial request is let through.
+                                    Defaults to ``reset_timeout``.
+        """
+
+        if failure_threshold is not None:
+            self.failure_threshold = failure_threshold
+
+        if reset_timeout is not None:
+            self.reset_timeout = reset_timeout
+
+        if self.failure_threshold < 1:
+            raise ValueError("Failure threshold must be at least 1.")
+
+        self._hosts = {}  # Host -> [failures in a row, time the circuit opened].
+        self._lock = threading.Lock()
+
+    def allow(self, url):
+        """
+        Checks a request to the given URL can be made.
+
+        :param str url: Request URL.
+        :return: False if the circuit of the host is open.
+        :rtype: bool
+        """
+
+        with self._lock:
+            host = self._hosts.get(urlsplit(url).hostname)
+
+            if host is None or host[1] is None:
+                return True
+
+            # Half-open - let one trial request through.
+            now = time.monotonic()
+
+            if now - host[1] >= self.reset_timeout:
+                host[1] = now
+
+                return True
+
+            return False
+
+    def is_open(self, url):
+        """
+        Checks the circuit of the host of the given URL is open.
+
+        :param str url: Request URL.
+        :return: True if requests to the host fail fast.
+        :rtype: bool
+        """
+
+        with self._lock:
+            host = self._hosts.get(urlsplit(url).hostname)
+
+            return host is not None and host[1] is not None
+
+    def record_success(self, url):
+        """
+        Records a successful request - closes the circuit.
+
+        :param str url: Request URL.
+        """
+
+        with self._lock:
+            self._hosts.pop(urlsplit(url).hostname, None)
+
+    def record_failure(self, url):
+        """
+        Records a failed request (connection error, timeout or
+        server error) - opens the circuit once there are
+        ``failure_threshold`` failures in a row.
+
+        :param str url: Request URL.
+        """
+
+        with self._lock:
+            host = self._hosts.setdefault(urlsplit(url).hostname, [0, None])
+            host[0] += 1
+
+            if host[0] >= self.failure_threshold:
+                host[1] = time.monotonic()
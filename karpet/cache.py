@@ -0,0 +1,399 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class MemoryCache:
+    """
+    In-memory HTTP response cache. Size is bounded by number of
+    entries and by total size of the cached responses (as downloaded
+    - parsed data take a few times more memory) - the least recently
+    used ones are evicted first.
+
+    Cached data are shared between callers so they must not be
+    modified.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        """
+        Constructor.
+
+        :param int max_entries: Max number of cached responses.
+        :param int max_bytes: Max total size of cached responses (see "size"
+                              of cache entry).
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns cached entry for the given key.
+
+        :param str key: Cache key (URL).
+        :return: Cache entry or None if not cached.
+        :rtype: dict or None
+        """
+
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+
+            return self._entries[key]
+
+    def set(self, key, entry):
+        """
+        Caches the given entry and evicts the least recently used
+        entries if the cache is full.
+
+        :param str key: Cache key (URL).
+        :param dict entry: Cache entry.
+        """
+
+        with self._lock:
+            replaced = self._entries.pop(key, None)
+
+            if replaced is not None:
+                self._bytes -= replaced.get("size", 0)
+
+            # Entry bigger than the whole budget would just flush the cache.
+            if entry.get("size", 0) > self.max_bytes:
+                return
+
+            self._entries[key] = entry
+            self._bytes += entry.get("size", 0)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.get("size", 0)
+
+    def clear(self):
+        """
+        Drops all cached entries.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class DiskCache:
+    """
+    On-disk HTTP response cache - one pickle file per entry. Size is
+    bounded by number of entries and by total size of the files - the
+    least recently used ones are evicted first.
+
+    Usage order is kept in memory (and in file modification times so
+    it survives restarts) so eviction doesn't scan the directory.
+    """
+
+    def __init__(self, path, max_entries=4096, max_bytes=1024 * 1024 * 1024):
+        """
+        Constructor.
+
+        :param str path: Directory the cache is stored in. Created if missing.
+        :param int max_entries: Max number of cached responses.
+        :param int max_bytes: Max total size of cache files.
+        """
+
+        self.path = os.path.expanduser(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._last_used = 0
+        os.makedirs(self.path, exist_ok=True)
+
+        # File name -> size, the least recently used first.
+        self._files = OrderedDict()
+        self._bytes = 0
+
+        for file in sorted(self._list_files(), key=lambda f: f.stat().st_mtime_ns):
+            size = file.stat().st_size
+            self._files[file.name] = size
+            self._bytes += size
+
+        with self._lock:
+            self._evict()
+
+    def get(self, key):
+        """
+        Returns cached entry for the given key.
+
+        :param str key: Cache key (URL).
+        :return: Cache entry or None if not cached.
+        :rtype: dict or None
+        """
+
+        file = self._get_file(key)
+
+        try:
+            with open(file, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        try:
+            self._touch(file)
+        except FileNotFoundError:
+            # Evicted meanwhile.
+            pass
+
+        with self._lock:
+            name = os.path.basename(file)
+
+            if name in self._files:
+                self._files.move_to_end(name)
+
+        return entry
+
+    def set(self, key, entry):
+        """
+        Caches the given entry and evicts the least recently used
+        entries if the cache is full.
+
+        :param str key: Cache key (URL).
+        :param dict entry: Cache entry.
+        """
+
+        file = self._get_file(key)
+        name = os.path.basename(file)
+
+        # Write to a temporary file first so readers never see
+        # a half-written file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+
+            os.replace(tmp_path, file)
+        except:
+            os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._bytes -= self._files.pop(name, 0)
+
+            # Entry bigger than the whole budget would just flush the cache.
+            if size > self.max_bytes:
+                self._remove(name)
+
+                return
+
+            self._files[name] = size
+            self._bytes += size
+            self._evict()
+
+        try:
+            self._touch(file)
+        except FileNotFoundError:
+            # Evicted meanwhile.
+            pass
+
+    def clear(self):
+        """
+        Drops all cached entries.
+        """
+
+        with self._lock:
+            for file in self._list_files():
+                self._remove(file.name)
+
+            self._files.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        """
+        Removes the least recently used entries so the cache fits
+        ``max_entries`` and ``max_bytes``. Must be called with the
+        lock held.
+        """
+
+        while self._files and (
+            len(self._files) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            name, size = self._files.popitem(last=False)
+            self._bytes -= size
+            self._remove(name)
+
+    def _touch(self, file):
+        """
+        Marks the given cache file as recently used. Modification times
+        are kept strictly increasing as filesystem clock may be coarse.
+
+        :param str file: File path.
+        """
+
+        with self._lock:
+            self._last_used = max(time.time_ns(), self._last_used + 1)
+            used = self._last_used
+
+        os.utime(file, ns=(used, used))
+
+    def _list_files(self):
+        """
+        Lists all cache files.
+
+        :return: List of cache files.
+        :rtype: list
+        """
+
+        return [e for e in os.scandir(self.path) if e.name.endswith(".pickle")]
+
+    def _remove(self, name):
+        """
+        Removes the given cache file. Already removed files are ignored.
+
+        :param str name: Cache file name.
+        """
+
+        try:
+            os.remove(os.path.join(self.path, name))
+        except FileNotFoundError:
+            pass
+
+    def _get_file(self, key):
+        """
+        Returns path of the cache file for the given key.
+
+        :param str key: Cache key (URL).
+        :return: File path.
+        :rtype: str
+        """
+
+        return os.path.join(
+            self.path, hashlib.sha1(key.encode()).hexdigest() + ".pickle"
+        )
+
+
+class NewsCache:
+    """
+    Persistent (SQLite) cache of news features keyed by news URL.
+    Article features don't change after publication so they never
+    expire. Size is bounded by number of entries - the least recently
+    used ones are evicted first.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        """
+        Constructor.
+
+        :param str path: SQLite database file. Created if missing.
+        :param int max_entries: Max number of cached news.
+        """
+
+        self.path = os.path.expanduser(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS news ("
+                "url TEXT PRIMARY KEY, title TEXT, description TEXT, date TEXT, "
+                "image TEXT, used INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS news_used ON news (used)")
+
+    def get_many(self, urls):
+        """
+        Returns cached features for the given URLs.
+
+        :param list urls: News URLs.
+        :return: Dict where keys are cached URLs and values dicts of features.
+        :rtype: dict
+        """
+
+        found = {}
+
+        if not urls:
+            return found
+
+        with self._lock, self._db:
+            # Chunked as SQLite limits number of query params.
+            for i in range(0, len(urls), 500):
+                chunk = urls[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    "SELECT url, title, description, date, image FROM news "
+                    f"WHERE url IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                self._db.execute(
+                    f"UPDATE news SET used = ? WHERE url IN ({placeholders})",
+                    [time.time_ns()] + chunk,
+                )
+
+                for url, title, description, date, image in rows:
+                    found[url] = {
+                        "title": title,
+                        "description": description,
+                        "date": datetime.fromisoformat(date) if date else None,
+                        "image": image,
+                    }
+
+        return found
+
+    def set_many(self, news):
+        """
+        Caches features of the given news and evicts the least recently
+        used news if the cache is full.
+
+        :param list news: News objects (dicts with ``url`` and features).
+        """
+
+        if not news:
+            return
+
+        used = time.time_ns()
+        rows = [
+            (
+                n["url"],
+                n.get("title"),
+                n.get("description"),
+                n["date"].isoformat() if n.get("date") else None,
+                n.get("image"),
+                used,
+            )
+            for n in news
+        ]
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO news VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.execute(
+                "DELETE FROM news WHERE url IN "
+                "(SELECT url FROM news ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """
+        Drops all cached news.
+        """
+
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM news")
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        with self._lock:
+            self._db.close()
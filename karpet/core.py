@@ -1,57 +1,248 @@
-try:
-    from pytrends.request import TrendReq
-except:
-    pass
-
-import asyncio
+import json
+import re
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
 from datetime import datetime, timedelta
+from operator import itemgetter
+from urllib.parse import urlsplit
+
+from .breaker import CircuitBreaker
+from .cache import MemoryCache
+from .ratelimit import RateLimiter, TokenBucket
+from .search import CoinSearchIndex
+from .utils import (
+    date_to_timestamp,
+    parse_head_meta,
+    parse_top_news,
+    stitch_trend_batches,
+)
 
-import aiohttp
-import numpy as np
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter, Retry
+# Heavy dependencies (pandas, numpy, aiohttp, requests, pytrends, ...) are
+# imported by the methods which need them so "import karpet" stays fast.
+
+# Time (time.monotonic()) requests of the current thread or task have
+# to finish by - see Karpet.deadline().
+_deadline = ContextVar("karpet_deadline", default=None)
 
 
 class Karpet:
+    """
+    Instances are thread-safe - one instance can be shared by many
+    threads (see ``map()``). Lazily filled state (session, quick search
+    data, symbol index) is fetched just once.
+    """
+
     quick_search_data = None
+    coin_ids_ttl = 3600  # Seconds before symbol -> IDs index is rebuilt.
+    _coin_ids_index = None  # Tuple of build time and the index.
+    _coin_ids_lock = threading.Lock()
+    exchanges_ttl = 3600  # Seconds before exchange listings index is rebuilt.
+    _exchanges_index = None  # Tuple of build time and the indexes.
+    _exchanges_lock = threading.Lock()
+    rate_limiter = RateLimiter()  # Shared by all instances.
+    circuit_breaker = CircuitBreaker()  # Shared by all instances.
+    news_meta_properties = (
+        "og:title",
+        "og:description",
+        "og:image",
+        "article:published_time",
+    )
+    news_head_end = re.compile(rb"</head|<body", re.IGNORECASE)
+    news_head_limit = 512 * 1024  # Max bytes read from news page.
+    news_concurrency = 10  # Max news pages downloaded at once.
+    news_timeout = 10  # Seconds per news page.
+    news_deadline = 30  # Seconds for all news pages of one call.
+    top_news_headers = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:69.0) Gecko/20100101 Firefox/69.0"
+    }
     req_retries = 4
     req_backoff_factor = 3
-
-    def __init__(self, start=None, end=None):
+    req_status_forcelist = (500, 502, 503, 504, 429)
+    req_pool_connections = 10  # Number of hosts connections are kept for.
+    req_pool_maxsize = 32  # Max connections kept per host - size it to your threads.
+    req_pool_block = False  # If True threads wait for a free connection.
+    req_keepalive = True  # If False connections are closed after every request.
+    # Seconds one request may take including retries (None = no limit).
+    req_deadline = 60
+
+    # Host -> base URL requests to the host are sent to instead
+    # (i.e. a local replay server - see benchmarks/replay.py).
+    base_urls = {}
+
+    # Google trends client class (pytrends ``TrendReq`` compatible).
+    # Defaults to ``TrendReq``.
+    trend_req_class = None
+
+    # Endpoint classes matched against URL path.
+    endpoints = (
+        ("coin_list", re.compile(r"/coins/list$")),
+        ("market_chart", re.compile(r"/coins/[^/]+/market_chart")),
+        ("ohlc", re.compile(r"/coins/[^/]+/ohlc$")),
+        ("markets", re.compile(r"/coins/markets$")),
+        ("coin", re.compile(r"/coins/[^/]+$")),
+        ("exchanges", re.compile(r"/data/v4/all/exchanges$")),
+        ("news", re.compile(r"/get_news/")),
+        ("quick_search", re.compile(r"/quick_search\.json$")),
+    )
+
+    # Cache TTL in seconds for each endpoint class (not listed = not cached).
+    cache_ttls = {
+        "coin_list": 24 * 3600,
+        "exchanges": 24 * 3600,
+        "quick_search": 24 * 3600,
+        "market_chart": 15 * 60,
+        "news": 5 * 60,
+        "coin": 60,
+        "markets": 60,
+        "ohlc": 60,
+    }
+
+    def __init__(
+        self,
+        start=None,
+        end=None,
+        store=None,
+        cache=None,
+        rate_limiter=None,
+        parse_executor=None,
+        news_cache=None,
+        json_loads=None,
+        stats=None,
+        circuit_breaker=None,
+    ):
         """
         Constructor.
 
         :param datetime.date start: History data begining.
         :param datetime.date end: History data end.
+        :param karpet.store.HistoryStore store: Optional persistent store of
+                                                historical data. If set only
+                                                missing data are downloaded.
+        :param cache: Optional HTTP response cache - ``karpet.cache.MemoryCache``,
+                      ``karpet.cache.DiskCache`` or any object with ``get(key)``
+                      and ``set(key, entry)`` methods. See ``cache_ttls``.
+        :param karpet.ratelimit.RateLimiter rate_limiter: Rate limiter used instead
+                                                          of the shared one.
+        :param parse_executor: Thread or process pool (``concurrent.futures.Executor``)
+                               HTML is parsed in. Defaults to event loop default
+                               executor.
+        :param karpet.cache.NewsCache news_cache: Optional persistent cache of news
+                                                  features - only news not fetched
+                                                  before are downloaded.
+        :param callable json_loads: Optional faster JSON decoder taking bytes
+                                    (i.e. ``orjson.loads``).
+        :param karpet.stats.Stats stats: Optional request metrics collector -
+                                         ``karpet.stats.Stats`` or any object
+                                         with the same ``on_*`` methods.
+        :param karpet.breaker.CircuitBreaker circuit_breaker: Circuit breaker used
+                                                              instead of the shared
+                                                              one.
         """
 
         self.start = start
         self.end = end
-        self.req_ses = self.get_session()
+        self.store = store
+        self.cache = cache
+        self.parse_executor = parse_executor
+        self.news_cache = news_cache
+        self.json_loads = json_loads
+        self.stats = stats
+
+        if rate_limiter:
+            self.rate_limiter = rate_limiter
+
+        if circuit_breaker:
+            self.circuit_breaker = circuit_breaker
+
+        self._req_ses = None
+        self._req_ses_lock = threading.Lock()
+        self._quick_search_lock = threading.Lock()
+        self._search_index = None
+        self._search_index_lock = threading.Lock()
+        # URL -> (future, deadline of the downloading caller) of in-flight
+        # _get_json() and the same by (loop, URL) for _get_json_async().
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._inflight_async = {}
+
+    @property
+    def req_ses(self):
+        """
+        Session for synchronous requests - created on first use
+        (see ``get_session()``).
+
+        :return: Session instance.
+        :rtype: requests.Session
+        """
+
+        if self._req_ses is None:
+            with self._req_ses_lock:
+                if self._req_ses is None:
+                    self._req_ses = self.get_session()
+
+        return self._req_ses
 
     def get_session(self):
-        # Waits for 1.5s, 3s, 6s, 12s, 24s between requests.
-        status_forcelist = (500, 502, 503, 504, 429)
-
-        retry = Retry(
-            total=self.req_retries,
-            read=self.req_retries,
-            connect=self.req_retries,
-            backoff_factor=self.req_backoff_factor,
-            status_forcelist=status_forcelist,
-            # method_whitelist=False,
+        import requests
+
+        from requests.adapters import HTTPAdapter
+
+        # Retries are made by _download_json() so every attempt
+        # is bounded by the deadline.
+        adapter = HTTPAdapter(
+            max_retries=0,
+            pool_connections=self.req_pool_connections,
+            pool_maxsize=self.req_pool_maxsize,
+            pool_block=self.req_pool_block,
         )
-        adapter = HTTPAdapter(max_retries=retry)
 
         session = requests.Session()
-        # session.mount("http://", adapter)
+        session.mount("http://", adapter)
         session.mount("https://", adapter)
 
+        if not self.req_keepalive:
+            session.headers["Connection"] = "close"
+
         return session
 
+    @contextmanager
+    def deadline(self, seconds):
+        """
+        Context manager which bounds time of all requests made within
+        it (in the current thread or task and the threads and tasks
+        started by karpet) including retries, backoff, Retry-After and
+        rate limiter waits. Requests and retries which wouldn't finish
+        in time are not made at all.
+        Nested deadlines can only shorten the outer one.
+
+        .. code-block:: python
+
+            with k.deadline(5):
+                df = k.fetch_crypto_historical_data(id="bitcoin")
+
+        Every single request is bounded by ``req_deadline`` as well.
+
+        :param float seconds: Seconds the requests have to finish in
+                              (None = no limit).
+        """
+
+        if seconds is None:
+            yield
+            return
+
+        deadline = time.monotonic() + seconds
+        outer = _deadline.get()
+        token = _deadline.set(deadline if outer is None else min(outer, deadline))
+
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
     def get_quick_search_data(self):
         """
         Downloads JSON from coinmarketcap.com quick search
@@ -77,12 +268,41 @@ class Karpet:
         """
 
         if not self.quick_search_data:
-            self.quick_search_data = self._get_json(
-                "https://s2.coinmarketcap.com/generated/search/quick_search.json"
-            )
+            with self._quick_search_lock:
+                if not self.quick_search_data:
+                    self.quick_search_data = self._get_json(
+                        "https://s2.coinmarketcap.com/generated/search/quick_search.json"
+                    )
 
         return self.quick_search_data
 
+    def search_coins(self, query, limit=10, fuzzy=False):
+        """
+        Searches coins by prefix of their name, symbol, slug or tokens
+        (see ``get_quick_search_data()``) - i.e. for autocomplete. Exact
+        matches go first, then prefix matches (each ordered by rank).
+
+        The search index is built on first search and rebuilt only once
+        ``quick_search_data`` change so searches take microseconds.
+
+        .. code-block:: python
+
+            k.search_coins("bitc")
+            [{"name": "Bitcoin", "symbol": "BTC", "rank": 1, ...}, ...]
+
+        :param str query: Searched text (case insensitive).
+        :param int limit: Max number of coins.
+        :param bool fuzzy: Tolerate one typo (missing, extra, wrong or swapped
+                           letter) if there are not enough matches.
+        :raises Exception: In case of unreachable data or error during parsing.
+        :return: List of quick search data items (shared - must not be modified).
+        :rtype: list
+        """
+
+        return self._get_search_index(self.get_quick_search_data()).search(
+            query, limit, fuzzy
+        )
+
     def fetch_crypto_historical_data(self, symbol=None, id=None):
         """
         Retrieve basic historical information (by days) for a specific
@@ -97,6 +317,9 @@ class Karpet:
 
         Index is datetime64[ns].
 
+        If the instance was created with ``start`` date only the
+        requested date range is downloaded.
+
         :param str symbol: Coin symbol - i.e. BTC, ETH, ...
         :param str id: Coin ID (based on coingecko.com).
         :raises Exception: If data couldn't be download form the internet.
@@ -108,43 +331,84 @@ class Karpet:
 
         # Fetch data.
         data = []
-        url = f"https://api.coingecko.com/api/v3/coins/{id}/market_chart?vs_currency=usd&days=max"
+        url, stored = self._get_historical_data_request(id)
 
         # Fetch and check the response.
         data = self._get_json(url)
 
-        if (
-            "prices" not in data
-            or "market_caps" not in data
-            or "total_volumes" not in data
-        ):
-            raise Exception("Couldn't download necessary data from the internet.")
+        return self._get_historical_data_df(id, data, stored)
 
-        # Assembly the dataframe.
-        prices = np.array(data["prices"])
-        prices = pd.Series(prices[:, 1], index=prices[:, 0], name="price")
+    def fetch_crypto_historical_data_many(
+        self, symbols=None, ids=None, concurrency=10, long_format=False
+    ):
+        """
+        Retrieve historical data for many coins at once. Data are
+        downloaded concurrently - at most ``concurrency`` requests
+        are in flight at the same time.
+
+        Every coin is processed independently so a failure of one coin
+        doesn't abort the whole batch - the exception is reported in
+        the second item of the returned tuple instead.
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int concurrency: Max number of concurrent requests.
+        :param bool long_format: If True one long-format dataframe with
+                                 ``id`` column is returned instead of dict
+                                 of dataframes.
+        :raises AttributeError: If symbols and ids params are empty.
+        :return: Tuple where first is dict of dataframes (by coin ID) or
+                 one long-format dataframe and second is dict of errors
+                 (by coin symbol or ID).
+        :rtype: tuple
+        """
 
-        market_caps = np.array(data["market_caps"])
-        market_caps = pd.Series(
-            market_caps[:, 1], index=market_caps[:, 0], name="market_cap"
-        )
+        import pandas as pd
 
-        total_volumes = np.array(data["market_caps"])
-        total_volumes = pd.Series(
-            total_volumes[:, 1], index=total_volumes[:, 0], name="total_volume"
-        )
-        df = pd.concat([prices, market_caps, total_volumes], axis=1)
-        df.index = pd.to_datetime(df.index, unit="ms")
-        df.index = df.index.normalize()
+        frames, errors = self._fetch_historical_data_many(symbols, ids, concurrency)
 
-        # Check if data are limited and if yes drop the unwanted data.
-        if self.start:
-            df = df[df.index.date >= self.start]
+        if long_format:
+            if frames:
+                frames = pd.concat(
+                    [df.assign(id=id) for id, df in frames.items()], axis=0
+                )[["id", "price", "market_cap", "total_volume"]]
+            else:
+                frames = pd.DataFrame(
+                    columns=["id", "price", "market_cap", "total_volume"]
+                )
 
-        if self.end:
-            df = df[df.index.date <= self.end]
+        return frames, errors
 
-        return df
+    def fetch_crypto_historical_data_panel(
+        self, symbols=None, ids=None, concurrency=10, dtype="float64"
+    ):
+        """
+        Retrieve historical data for many coins as one panel - all the coins
+        share one daily index and all values sit in one contiguous array.
+        Data are downloaded concurrently (see
+        ``fetch_crypto_historical_data_many()``) and every coin is copied
+        to compact arrays as soon as it's downloaded.
+
+        Columns are ``(field, coin ID)`` MultiIndex so ``df["price"]`` is
+        days x coins dataframe. Days a coin has no data for are NaN.
+        ``df.to_numpy().reshape(len(df), 3, -1)`` is days x fields x coins
+        view of the values.
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int concurrency: Max number of concurrent requests.
+        :param str dtype: Values dtype - "float64" or "float32" (half the memory).
+        :raises AttributeError: If symbols and ids params are empty.
+        :return: Tuple where first is the panel dataframe and second is dict
+                 of errors (by coin symbol or ID).
+        :rtype: tuple
+        """
+
+        coins, errors = self._fetch_historical_data_many(
+            symbols, ids, concurrency, lambda df: self._get_panel_coin(df, dtype)
+        )
+
+        return self._get_panel(coins, dtype), errors
 
     def fetch_crypto_live_data(self, symbol=None, id=None):
         """
@@ -177,16 +441,101 @@ class Karpet:
         # Fetch and check the response.
         data = self._get_json(url)
 
-        if not data:
-            raise Exception("Couldn't download necessary data from the internet.")
+        return self._ohlc_to_df(data)
 
-        # Assembly the dataframe.
-        data = np.array(data)
-        return pd.DataFrame.from_records(
-            data[:, 1:],
-            index=pd.to_datetime(data[:, 0], unit="ms"),
-            columns=["open", "high", "low", "close"],
-        )
+    def stream_crypto_live_data(
+        self, symbols=None, ids=None, interval=60, workers=None
+    ):
+        """
+        Polls OHLC price data (see ``fetch_crypto_live_data()``) of many
+        coins every ``interval`` seconds and yields just rows not yielded
+        before - new candles and the last yielded candle if it has been
+        updated since.
+
+        Every poll yields a tuple where first is dataframe with "id" column
+        and OHLC columns (index is datetime64[ns]) and second is dict of
+        errors of that poll by coin symbol or ID. Polls with no new rows
+        and no errors yield nothing. If none of the symbols can be resolved
+        the errors are yielded once and the generator stops.
+
+        .. code-block:: python
+
+            for df, errors in k.stream_crypto_live_data(ids=["bitcoin", "ethereum"]):
+                print(df)
+
+        All polls share the thread pool and the connection pool (see
+        ``req_pool_maxsize``). New rows are picked from the downloaded
+        data before any dataframe is built so unchanged data cost just
+        the request - with ``cache`` set they are revalidated (304) and
+        not even downloaded again (see ``cache_ttls``).
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param float interval: Seconds between polls.
+        :param int workers: Number of threads. Defaults to ``req_pool_maxsize``.
+        :raises AttributeError: If symbols and ids params are empty.
+        :return: Generator of tuples (dataframe, errors).
+        :rtype: generator
+        """
+
+        if (not symbols and not ids) or (symbols and ids):
+            raise AttributeError('Please hand "symbols" or "ids" param.')
+
+        errors = {}
+
+        # Resolve symbols to IDs.
+        if symbols:
+            ids = []
+
+            for symbol in symbols:
+                try:
+                    ids.append(self._get_coin_id_from_params(symbol=symbol))
+                except Exception as e:
+                    errors[symbol] = e
+
+        last_rows = {}  # Coin ID -> last yielded row.
+        workers = min(workers or self.req_pool_maxsize, max(len(ids), 1))
+
+        def poll(id):
+            try:
+                data = self._get_json(
+                    f"https://api.coingecko.com/api/v3/coins/{id}/ohlc"
+                    "?vs_currency=usd&days=1"
+                )
+
+                return self._get_ohlc_delta(data, last_rows.get(id)), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            next_poll = time.monotonic()
+
+            while True:
+                deltas = {}
+
+                # Polls keep the caller's deadline (see deadline()).
+                results = executor.map(self._with_context(poll), ids)
+
+                for id, (delta, error) in zip(ids, results):
+                    if error is not None:
+                        errors[id] = error
+                    elif delta:
+                        deltas[id] = delta
+                        last_rows[id] = delta[-1]
+
+                if deltas or errors:
+                    yield self._ohlc_deltas_to_df(deltas), errors
+
+                # Nothing to poll.
+                if not ids:
+                    return
+
+                errors = {}
+
+                # Sleep until the next scheduled poll - overdue one (slow
+                # poll or consumer) is made right away.
+                next_poll = max(next_poll + interval, time.monotonic())
+                time.sleep(max(next_poll - time.monotonic(), 0))
 
     def fetch_crypto_exchanges(self, symbol=None):
         """
@@ -198,15 +547,45 @@ class Karpet:
         :rtype: list
         """
 
+        # Answer from the listings index if it's built already.
+        index = self._get_fresh_exchanges_index()
+
+        if index is not None:
+            return list(index[0].get(symbol.upper(), ()))
+
         url = f"https://min-api.cryptocompare.com/data/v4/all/exchanges?fsym={symbol}"
 
         # Fetch and check the response.
         response_data = self._get_json(url)
 
-        if "Success" != response_data["Response"]:
-            raise Exception("Couldn't download necessary data from the internet.")
+        return self._exchanges_from_data(response_data)
 
-        return list(response_data["Data"]["exchanges"].keys())
+    def fetch_crypto_exchanges_many(self, symbols):
+        """
+        Batch variant of fetch_crypto_exchanges(). All symbols are looked
+        up in the listings index (see ``_get_exchanges_index()``) so just
+        one request is made no matter how many symbols are given.
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :return: Dict where keys are given symbols and values lists of exchanges.
+        :rtype: dict
+        """
+
+        index = self._get_exchanges_index()[0]
+
+        return {s: list(index.get(s.upper(), ())) for s in symbols}
+
+    def fetch_exchange_symbols(self, exchange):
+        """
+        Fetches symbols of all coins listed on the given exchange - see
+        ``fetch_crypto_exchanges_many()``.
+
+        :param str exchange: Exchange name - i.e. Binance, Kraken, ...
+        :return: List of symbols (empty if the exchange is unknown).
+        :rtype: list
+        """
+
+        return list(self._get_exchanges_index()[1].get(exchange, ()))
 
     def fetch_google_trends(
         self,
@@ -219,10 +598,15 @@ class Karpet:
         gprop="",
         hl="en-US",
         sleeptime=1,
+        workers=4,
     ):
         """
         Retrieve daily Google trends data for a list of search terms.
 
+        Long periods are split into overlapping searches which are fetched
+        concurrently (each worker has its own pytrends session) and stitched
+        together in date order once all of them are downloaded.
+
         This method is essentially a highly restricted wrapper for the pytrends package
         Any issues/questions related to its use would probably be more likely resolved
         by consulting the pytrends github page
@@ -237,15 +621,20 @@ class Karpet:
         :param str gprop: Filter results to specific google property available options are "images", "news", "youtube" or "froogle"
                           default is '', which refers to web searches - see pyTrends for more details.
         :param str hl: Language (e.g. 'en-US' (default), 'es').
-        :param int sleeptime: When stiching multiple searches, this sets the period between each.
+        :param int sleeptime: When stiching multiple searches, this sets the period between each
+                              (shared by all workers).
+        :param int workers: Max number of searches fetched at the same time.
         :return: Pandas dataframe with all results.
         :rtype: pd.DataFrame
         """
 
-        try:
-            _ = TrendReq
-        except NameError:
-            raise Exception("Google extension is not installed - see README file.")
+        trend_req_class = self.trend_req_class
+
+        if trend_req_class is None:
+            try:
+                from pytrends.request import TrendReq as trend_req_class
+            except ImportError:
+                raise Exception("Google extension is not installed - see README file.")
 
         # Validate params.
         if len(kw_list) > 5 or len(kw_list) == 0:
@@ -255,14 +644,11 @@ class Karpet:
         if overlap >= trdays:
             raise ValueError("Overlap can't exceed search days")
 
+        if workers < 1:
+            raise ValueError("Workers must be at least 1.")
+
         stich_overlap = trdays - overlap
         n_days = (self.end - self.start).days
-        pytrends = TrendReq(
-            hl=hl,
-            tz=tz,
-            retries=self.req_retries,
-            backoff_factor=self.req_backoff_factor,
-        )
 
         # Get the dates for each search.
         if n_days <= trdays:
@@ -280,45 +666,43 @@ class Karpet:
                 for i in range(0, n_days - trdays + stich_overlap, stich_overlap)
             ]
 
-        # Try to fetch first batch.
-        pytrends.build_payload(
-            kw_list, cat=cat, timeframe=trend_dates[0], geo=geo, gprop=gprop
-        )
-        df = pytrends.interest_over_time().reset_index()
+        # Every worker thread gets its own session, all of them share
+        # one rate budget.
+        local = threading.local()
+        bucket = TokenBucket(1 / sleeptime) if sleeptime else None
+
+        def fetch_batch(timeframe):
+            if not hasattr(local, "pytrends"):
+                local.pytrends = trend_req_class(
+                    hl=hl,
+                    tz=tz,
+                    retries=self.req_retries,
+                    backoff_factor=self.req_backoff_factor,
+                )
 
-        if len(df) == 0:
-            raise ValueError("Search term returned no results (insufficient data).")
+            if bucket:
+                bucket.acquire()
 
-        # Fetch other batches.
-        for date in trend_dates[1:]:
-            time.sleep(sleeptime)
-            pytrends.build_payload(
-                kw_list, cat=cat, timeframe=date, geo=geo, gprop=gprop
+            start = time.perf_counter()
+            local.pytrends.build_payload(
+                kw_list, cat=cat, timeframe=timeframe, geo=geo, gprop=gprop
             )
+            df = local.pytrends.interest_over_time()
 
-            temp_trend = pytrends.interest_over_time().reset_index()
-            temp_trend = temp_trend.merge(df, on="date", how="left")
-
-            # it's ugly but we'll exploit the common column names
-            # and then rename the underscore containing column names
-            for kw in kw_list:
-                norm_factor = np.ma.masked_invalid(
-                    temp_trend[kw + "_y"] / temp_trend[kw + "_x"]
-                ).mean()
-                temp_trend[kw] = temp_trend[kw + "_x"] * norm_factor
-
-            temp_trend = temp_trend[temp_trend.isnull().any(axis=1)]
-            temp_trend["isPartial"] = temp_trend["isPartial_x"]
-            df = pd.concat(
-                [df, temp_trend[["date", "isPartial"] + kw_list]], axis=0, sort=False
-            )
+            if self.stats:
+                # Response size is not known.
+                self.stats.on_request("google_trends", time.perf_counter() - start, 0)
 
-        # Reorder columns in alphabetical order.
-        df = df[["date", "isPartial"] + kw_list]
+            return df.reset_index()
 
-        # Drop "isPartial column".
-        df = df.drop("isPartial", axis=1)
+        # Fetch all batches (results keep order of trend_dates).
+        with ThreadPoolExecutor(max_workers=min(workers, len(trend_dates))) as executor:
+            batches = list(executor.map(fetch_batch, trend_dates))
 
+        if len(batches[0]) == 0:
+            raise ValueError("Search term returned no results (insufficient data).")
+
+        df = stitch_trend_batches(batches, kw_list)
         df = df[df["date"] >= self.start.strftime("%Y-%m-%d")]
 
         # The values in each column are relative to other columns
@@ -345,6 +729,8 @@ class Karpet:
         :param int limit: Limit for news count.
         """
 
+        import asyncio
+
         def get_news(symbol, limit):
             """
             Fetches news from coincodex.com.
@@ -402,62 +788,22 @@ class Karpet:
         * date
         * image
 
+        Fetching is limited by ``news_timeout`` and ``news_deadline`` - news
+        not fetched in time have their features set to None.
+
         :return: Tuple where first are editors choice news and second hot stories.
         :rtype: tuple
         """
 
-        def get_top_news():
-            """
-            Fetches editors choice and hot stories from cointelegraph.com front page.
-
-            :return: Dict with ``editors_choice`` and ``hot_stories`` items.
-            :rtype: dict
-            """
-
-            headers = {
-                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:69.0) Gecko/20100101 Firefox/69.0"
-            }
-            response = self.req_ses.get("https://cointelegraph.com/", headers=headers)
-            dom = BeautifulSoup(response.text, "lxml")
-
-            def parse_news(news_items):
-                """
-                Parse news URL from news LI HTML elements.
-
-                :param list news_items: List of LI HTML elements where A HTML elements sits.
-                :return: List of news dicts with "url" key.
-                :rtype: dict
-                """
-
-                news = []
-
-                for i in news_items:
-                    try:
-                        href = i.find("a")["href"]
-                    except AttributeError:
-                        # A without href attribute.
-                        continue
-
-                    if not href.startswith("https://"):
-                        href = "https://cointelegraph.com" + href
-
-                    news.append({"url": href})
+        import asyncio
 
-                return news
+        import aiohttp
 
-            container = dom.find(class_="main-news-controls__list")
-            news = container.find_all("li")
+        async def fetch_all():
+            async with aiohttp.ClientSession() as session:
+                return await self._fetch_top_news(session)
 
-            return parse_news(news[:5]), parse_news(news[5:])
-
-        # Fetch features.
-        editors_choice, hot_stories = get_top_news()
-        asyncio.run(self._fetch_news_features(editors_choice))
-        asyncio.run(self._fetch_news_features(hot_stories))
-
-        print(editors_choice, hot_stories)
-
-        return editors_choice, hot_stories
+        return asyncio.run(fetch_all())
 
     def get_coin_ids(self, symbol):
         """
@@ -474,16 +820,21 @@ class Karpet:
         :rtype: list
         """
 
-        url = "https://api.coingecko.com/api/v3/coins/list"
-        response_data = self._get_json(url)
-        symbol = symbol.upper()
-        found_ids = []
+        return list(self._get_coin_ids_index().get(symbol.upper(), ()))
 
-        for coin in response_data:
-            if coin["symbol"].upper() == symbol:
-                found_ids.append(coin["id"])
+    def get_coin_ids_many(self, symbols):
+        """
+        Batch variant of get_coin_ids(). Resolves all the given symbols
+        against one index.
 
-        return found_ids
+        :param list symbols: Symbols of the coins.
+        :return: Dict where keys are given symbols and values lists of ID's.
+        :rtype: dict
+        """
+
+        index = self._get_coin_ids_index()
+
+        return {s: list(index.get(s.upper(), ())) for s in symbols}
 
     def get_basic_info(self, symbol=None, id=None):
         """
@@ -519,73 +870,171 @@ class Karpet:
 
         id = self._get_coin_id_from_params(symbol, id)
 
-        data = self._get_json(f"https://api.coingecko.com/api/v3/coins/{id}")
-        data_chart = self._get_json(
-            f"https://api.coingecko.com/api/v3/coins/{id}/market_chart?vs_currency=usd&days=365"
-        )
-        sorted_chart_by_price = sorted(
-            data_chart["prices"],
-            key=lambda i: i[1],  # i is a list of [timestamp, price]
-        )
-        sorted_chart_by_date = sorted(
-            data_chart["prices"],
-            key=lambda i: i[0],  # i is a list of [timestamp, price]
-        )
+        # Both requests at once.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            data_chart = executor.submit(
+                self._with_context(self._get_json),
+                f"https://api.coingecko.com/api/v3/coins/{id}/market_chart?vs_currency=usd&days=365",
+            )
+            data = self._get_json(f"https://api.coingecko.com/api/v3/coins/{id}")
 
-        to_return = {
-            "name": data["name"],
-            "current_price": data["market_data"]["current_price"]["usd"],
-            "market_cap": data["market_data"]["market_cap"]["usd"],
-            "rank": data["market_data"]["market_cap_rank"],
-            "reddit_average_posts_48h": data["community_data"][
-                "reddit_average_comments_48h"
-            ],
-            "reddit_average_comments_48h": data["community_data"][
-                "reddit_average_comments_48h"
-            ],
-            "reddit_subscribers": data["community_data"]["reddit_subscribers"],
-            "reddit_accounts_active_48h": float(
-                data["community_data"]["reddit_accounts_active_48h"] or 0
-            ),
-            "forks": data["developer_data"]["forks"],
-            "stars": data["developer_data"]["stars"],
-            "total_issues": data["developer_data"]["total_issues"],
-            "closed_issues": data["developer_data"]["closed_issues"],
-            "pull_request_contributors": data["developer_data"][
-                "pull_request_contributors"
-            ],
-            "commit_count_4_weeks": data["developer_data"]["commit_count_4_weeks"],
-            "year_low": sorted_chart_by_price[0][1],
-            "year_high": sorted_chart_by_price[-1][1],
-            "yoy_change": 100
-            * (sorted_chart_by_date[-1][1] / sorted_chart_by_date[0][1] - 1),
-            "price_change_24": data["market_data"]["price_change_24h"],
-            "price_change_24_percents": data["market_data"][
-                "price_change_percentage_24h"
-            ],
-        }
+            return self._basic_info_from_data(data, data_chart.result())
 
-        # Calculate open issues.
-        if (
-            data["developer_data"]["total_issues"]
-            and data["developer_data"]["closed_issues"]
-        ):
-            to_return["open_issues"] = (
-                data["developer_data"]["total_issues"]
-                - data["developer_data"]["closed_issues"]
-            )
-        else:
-            to_return["open_issues"] = None
+    def get_basic_info_many(self, symbols=None, ids=None, top=None, workers=4):
+        """
+        Fetches basic data for many coins at once from coingecko.com
+        bulk markets endpoint (250 coins per request). Either coins are
+        given by symbols/ID's or ``top`` coins by market cap are fetched.
 
-        return to_return
+        Bulk endpoint provides just a subset of get_basic_info() data:
+
+        - name
+        - current_price
+        - market_cap
+        - rank
+        - yoy_change
+        - price_change_24
+        - price_change_24_percents
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int top: Number of top coins by market cap.
+        :param int workers: Max number of concurrent requests.
+        :raises AttributeError: If none or more of symbols, ids and top params are set.
+        :return: Dict where keys are coin ID's and values basic data dicts.
+        :rtype: dict
+        """
+
+        urls = self._get_basic_info_many_urls(symbols, ids, top)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = list(executor.map(self._with_context(self._get_json), urls))
+
+        return self._basic_info_many_from_pages(pages, top)
+
+    def map(self, method, symbols=None, ids=None, workers=None, **kwargs):
+        """
+        Runs the given method for every coin on a thread pool. All
+        threads share this instance and so its connection pool (see
+        ``req_pool_maxsize``).
+
+        Every coin is processed independently so a failure of one coin
+        doesn't abort the others - the exception is reported in the second
+        item of the returned tuple instead.
+
+        .. code-block:: python
+
+            data, errors = k.map("fetch_crypto_live_data", ids=["bitcoin", "ethereum"])
+
+        :param method: Method name (i.e. "fetch_crypto_live_data") or any callable
+                       taking ``symbol`` or ``id`` keyword argument.
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int workers: Number of threads. Defaults to ``req_pool_maxsize``.
+        :param kwargs: Other arguments passed to the method.
+        :raises AttributeError: If symbols and ids params are empty.
+        :return: Tuple where first is dict of results and second is dict of errors
+                 (both by coin symbol or ID).
+        :rtype: tuple
+        """
+
+        if (not symbols and not ids) or (symbols and ids):
+            raise AttributeError('Please hand "symbols" or "ids" param.')
+
+        if isinstance(method, str):
+            method = getattr(self, method)
+
+        keys = symbols or ids
+        param = "symbol" if symbols else "id"
+        workers = min(workers or self.req_pool_maxsize, len(keys))
+
+        def call(key):
+            try:
+                return method(**{param: key}, **kwargs), None
+            except Exception as e:
+                return None, e
+
+        results = {}
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for key, (result, error) in zip(
+                keys, executor.map(self._with_context(call), keys)
+            ):
+                if error is None:
+                    results[key] = result
+                else:
+                    errors[key] = error
+
+        return results, errors
+
+    async def _fetch_top_news(self, session):
+        """
+        Fetches editors choice and hot stories from cointelegraph.com front page
+        including their features.
+
+        :param aiohttp.ClientSession session: Session instance.
+        :return: Tuple where first are editors choice news and second hot stories.
+        :rtype: tuple
+        """
+
+        import asyncio
+
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.news_deadline
+        url = "https://cointelegraph.com/"
+
+        await self.rate_limiter.acquire_async(url)
+        start = time.perf_counter()
+
+        async with session.get(
+            self._get_url(url),
+            headers=self.top_news_headers,
+            timeout=aiohttp.ClientTimeout(total=self.news_timeout),
+        ) as response:
+            body = await response.read()
+            html = body.decode(response.get_encoding())
+
+        parse_start = time.perf_counter()
+        editors_choice, hot_stories = await loop.run_in_executor(
+            self.parse_executor, parse_top_news, html
+        )
 
-    async def _fetch_news_features(self, news):
+        if self.stats:
+            self.stats.on_request("top_news", parse_start - start, len(body))
+            self.stats.on_parse("top_news", time.perf_counter() - parse_start)
+        await self._fetch_news_features(editors_choice + hot_stories, session, deadline)
+
+        return editors_choice, hot_stories
+
+    async def _fetch_news_features(self, news, session=None, deadline=None):
         """
-        Asynchronously fetches all news features.
+        Asynchronously fetches all news features. At most ``news_concurrency``
+        news are fetched at once, each of them for at most ``news_timeout``
+        seconds. News not fetched until the deadline are left without
+        features (set to None).
 
         :param list news: List of news objects.
+        :param aiohttp.ClientSession session: Session to be used. If not set
+                                              a new one is opened for this call.
+        :param float deadline: Event loop time all the news have to be fetched
+                               by. Defaults to ``news_deadline`` seconds from now.
         """
 
+        import asyncio
+
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.news_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.news_timeout)
+        fetched = []
+
+        if deadline is None:
+            deadline = loop.time() + self.news_deadline
+
         async def fetch_all(session, news):
             """
             Fetches all news features.
@@ -594,7 +1043,19 @@ class Karpet:
             :param list news: List of news objects.
             """
 
-            await asyncio.gather(*[fetch_one(session, n) for n in news])
+            if not news:
+                return
+
+            tasks = [asyncio.ensure_future(fetch_one(session, n)) for n in news]
+            _, pending = await asyncio.wait(
+                tasks, timeout=max(0, deadline - loop.time())
+            )
+
+            # Return what we have.
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
 
         async def fetch_one(session, news):
             """
@@ -610,56 +1071,324 @@ class Karpet:
             :param object news: News object.
             """
 
+            async with semaphore:
+                if not await self.rate_limiter.acquire_async(
+                    news["url"], deadline - loop.time()
+                ):
+                    return
+
+                request_start = time.perf_counter()
+
+                try:
+                    async with session.get(
+                        self._get_url(news["url"]), timeout=timeout
+                    ) as response:
+                        # Error pages (i.e. rate limited) have no features.
+                        if not 200 <= response.status < 300:
+                            return
+
+                        # Read just the head - the rest of the page is not needed.
+                        head = bytearray()
+
+                        async for chunk in response.content.iter_any():
+                            start = max(0, len(head) - 6)
+                            head += chunk
+
+                            if (
+                                self.news_head_end.search(head, start)
+                                or len(head) >= self.news_head_limit
+                            ):
+                                break
+
+                        encoding = response.charset or "utf-8"
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    return
+
+            # Parse outside of the event loop.
+            parse_start = time.perf_counter()
+            meta = await loop.run_in_executor(
+                self.parse_executor,
+                parse_head_meta,
+                bytes(head),
+                encoding,
+                self.news_meta_properties,
+            )
+
+            if self.stats:
+                self.stats.on_request(
+                    "news_page", parse_start - request_start, len(head)
+                )
+                self.stats.on_parse("news_page", time.perf_counter() - parse_start)
+
+            news["title"] = meta.get("og:title")
+            news["image"] = meta.get("og:image")
+            news["description"] = meta.get("og:description")
+
+            # Date.
             try:
-                async with session.get(news["url"]) as response:
-                    html = await response.text()
-                    dom = BeautifulSoup(html, features="lxml")
-
-                    # Title.
-                    try:
-                        news["title"] = dom.find("meta", {"property": "og:title"})[
-                            "content"
-                        ]
-                    except:
-                        news["title"] = None
-
-                    # Date.
-                    try:
-                        d = dom.find("meta", {"property": "article:published_time"})[
-                            "content"
-                        ]
-                        news["date"] = datetime.strptime(d, "%Y-%m-%dT%H:%M:%S%z")
-                    except:
-                        news["date"] = None
-
-                    # Image.
-                    try:
-                        news["image"] = dom.find("meta", {"property": "og:image"})[
-                            "content"
-                        ]
-                    except:
-                        news["image"] = None
-
-                    # Description.
-                    try:
-                        news["description"] = dom.find(
-                            "meta", {"property": "og:description"}
-                        )["content"]
-                    except:
-                        news["description"] = None
-            except (aiohttp.ClientResponseError, UnicodeDecodeError):
-                pass
-
-        async with aiohttp.ClientSession() as session:
-            await fetch_all(session, news)
+                news["date"] = datetime.strptime(
+                    meta["article:published_time"], "%Y-%m-%dT%H:%M:%S%z"
+                )
+            except (KeyError, ValueError):
+                news["date"] = None
+
+            # Pages without the date may be broken so they are not cached
+            # and will be fetched again next time.
+            if news["date"] is not None:
+                fetched.append(news)
+
+        # Features of already fetched news are taken from the cache.
+        if self.news_cache:
+            cached = await loop.run_in_executor(
+                None, self.news_cache.get_many, [n["url"] for n in news]
+            )
 
-    def _drop_bad_news(self, news):
-        """
-        Drops news that doesn't suit following requirements.
+            for n in news:
+                n.update(cached.get(n["url"], {}))
 
-        * must have published date (date)
+            missing = [n for n in news if n["url"] not in cached]
+        else:
+            missing = news
 
-        :param list news: List of news.
+        try:
+            if session:
+                await fetch_all(session, missing)
+            else:
+                async with aiohttp.ClientSession() as session:
+                    await fetch_all(session, missing)
+        finally:
+            # News which couldn't be fetched.
+            for n in missing:
+                for feature in ("title", "date", "image", "description"):
+                    n.setdefault(feature, None)
+
+        if self.news_cache:
+            await loop.run_in_executor(None, self.news_cache.set_many, fetched)
+
+    def _ohlc_to_df(self, data):
+        """
+        Assemblies OHLC dataframe from coingecko.com OHLC data.
+
+        :param list data: List of [timestamp, open, high, low, close] lists.
+        :raises Exception: If data are empty.
+        :return: Dataframe with OHLC data.
+        :rtype: pd.DataFrame
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        if not data:
+            raise Exception("Couldn't download necessary data from the internet.")
+
+        # Assembly the dataframe.
+        data = np.array(data)
+        return pd.DataFrame.from_records(
+            data[:, 1:],
+            index=pd.to_datetime(data[:, 0], unit="ms"),
+            columns=["open", "high", "low", "close"],
+        )
+
+    def _get_ohlc_delta(self, data, last_row=None):
+        """
+        Picks OHLC rows not yielded before - newer than the last yielded
+        row or the last yielded row itself if it has been updated since.
+        Rows are scanned from the newest so unchanged data cost just one
+        comparison.
+
+        :param list data: List of [timestamp, open, high, low, close] lists.
+        :param list last_row: Last yielded row or None.
+        :raises Exception: If data are empty.
+        :return: List of rows (oldest first).
+        :rtype: list
+        """
+
+        if not data:
+            raise Exception("Couldn't download necessary data from the internet.")
+
+        if last_row is None:
+            return list(data)
+
+        delta = []
+
+        for row in reversed(data):
+            if row[0] < last_row[0] or row == last_row:
+                break
+
+            delta.append(row)
+
+        delta.reverse()
+
+        return delta
+
+    def _ohlc_deltas_to_df(self, deltas):
+        """
+        Assemblies long-format OHLC dataframe from rows of many coins.
+
+        :param dict deltas: Coin ID -> list of [timestamp, open, high, low, close]
+                            lists.
+        :return: Dataframe with "id" and OHLC columns.
+        :rtype: pd.DataFrame
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        if not deltas:
+            return pd.DataFrame(columns=["id", "open", "high", "low", "close"])
+
+        data = np.array([row for rows in deltas.values() for row in rows], dtype=float)
+        df = pd.DataFrame(
+            data[:, 1:],
+            index=pd.to_datetime(data[:, 0], unit="ms"),
+            columns=["open", "high", "low", "close"],
+        )
+        df.insert(0, "id", np.repeat(list(deltas), [len(r) for r in deltas.values()]))
+
+        return df
+
+    def _exchanges_from_data(self, response_data):
+        """
+        Extracts exchange names from cryptocompare.com exchanges data.
+
+        :param dict response_data: Downloaded exchanges data.
+        :raises Exception: If the response is not successful.
+        :return: List of exchanges.
+        :rtype: list
+        """
+
+        if "Success" != response_data["Response"]:
+            raise Exception("Couldn't download necessary data from the internet.")
+
+        return list(response_data["Data"]["exchanges"].keys())
+
+    def _basic_info_from_data(self, data, data_chart):
+        """
+        Assemblies basic info dict - see get_basic_info().
+
+        :param dict data: Downloaded coin data.
+        :param dict data_chart: Downloaded year market chart data.
+        :return: Basic data as a dict.
+        :rtype: dict
+        """
+
+        import numpy as np
+
+        # Rows are [timestamp, price].
+        chart = np.array(data_chart["prices"], dtype=np.float64)
+        prices = chart[:, 1]
+        first_price = prices[chart[:, 0].argmin()]
+        last_price = prices[chart[:, 0].argmax()]
+
+        to_return = {
+            "name": data["name"],
+            "current_price": data["market_data"]["current_price"]["usd"],
+            "market_cap": data["market_data"]["market_cap"]["usd"],
+            "rank": data["market_data"]["market_cap_rank"],
+            "reddit_average_posts_48h": data["community_data"][
+                "reddit_average_comments_48h"
+            ],
+            "reddit_average_comments_48h": data["community_data"][
+                "reddit_average_comments_48h"
+            ],
+            "reddit_subscribers": data["community_data"]["reddit_subscribers"],
+            "reddit_accounts_active_48h": float(
+                data["community_data"]["reddit_accounts_active_48h"] or 0
+            ),
+            "forks": data["developer_data"]["forks"],
+            "stars": data["developer_data"]["stars"],
+            "total_issues": data["developer_data"]["total_issues"],
+            "closed_issues": data["developer_data"]["closed_issues"],
+            "pull_request_contributors": data["developer_data"][
+                "pull_request_contributors"
+            ],
+            "commit_count_4_weeks": data["developer_data"]["commit_count_4_weeks"],
+            "year_low": float(prices.min()),
+            "year_high": float(prices.max()),
+            "yoy_change": float(100 * (last_price / first_price - 1)),
+            "price_change_24": data["market_data"]["price_change_24h"],
+            "price_change_24_percents": data["market_data"][
+                "price_change_percentage_24h"
+            ],
+        }
+
+        # Calculate open issues.
+        if (
+            data["developer_data"]["total_issues"]
+            and data["developer_data"]["closed_issues"]
+        ):
+            to_return["open_issues"] = (
+                data["developer_data"]["total_issues"]
+                - data["developer_data"]["closed_issues"]
+            )
+        else:
+            to_return["open_issues"] = None
+
+        return to_return
+
+    def _get_basic_info_many_urls(self, symbols=None, ids=None, top=None):
+        """
+        Returns coingecko.com bulk markets URLs for get_basic_info_many().
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int top: Number of top coins by market cap.
+        :raises AttributeError: If none or more of symbols, ids and top params are set.
+        :return: List of URLs.
+        :rtype: list
+        """
+
+        if 1 != sum(1 for p in (symbols, ids, top) if p):
+            raise AttributeError('Please hand "symbols", "ids" or "top" param.')
+
+        url = "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&price_change_percentage=1y"
+
+        if top:
+            return [f"{url}&page={p}" for p in range(1, (top - 1) // 250 + 2)]
+
+        if symbols:
+            ids = [self._get_coin_id_from_params(symbol=s) for s in symbols]
+
+        return [
+            f"{url}&ids={','.join(ids[i : i + 250])}" for i in range(0, len(ids), 250)
+        ]
+
+    def _basic_info_many_from_pages(self, pages, top=None):
+        """
+        Assemblies basic info dicts from bulk markets data - see
+        get_basic_info_many().
+
+        :param list pages: Downloaded markets pages.
+        :param int top: Number of top coins by market cap.
+        :return: Dict where keys are coin ID's and values basic data dicts.
+        :rtype: dict
+        """
+
+        to_return = {}
+
+        for coin in (c for page in pages for c in page):
+            to_return[coin["id"]] = {
+                "name": coin["name"],
+                "current_price": coin["current_price"],
+                "market_cap": coin["market_cap"],
+                "rank": coin["market_cap_rank"],
+                "yoy_change": coin.get("price_change_percentage_1y_in_currency"),
+                "price_change_24": coin["price_change_24h"],
+                "price_change_24_percents": coin["price_change_percentage_24h"],
+            }
+
+            if top and len(to_return) == top:
+                break
+
+        return to_return
+
+    def _drop_bad_news(self, news):
+        """
+        Drops news that doesn't suit following requirements.
+
+        * must have published date (date)
+
+        :param list news: List of news.
         :return: Filtered list of news.
         :rtype: list
         """
@@ -679,25 +1408,1127 @@ class Karpet:
         Downloads data from the given  URL and parses them as JSON.
         Handles exception and raises own ones with sane messages.
 
+        Concurrent calls for the same URL are coalesced - just the first
+        one downloads the data, the others wait for its result (or exception)
+        but not longer than their deadline (see ``deadline()``). Callers
+        with longer deadline than the downloading one don't take over its
+        failure but try again. The result is shared so it must not be modified.
+
         :param str url: URL to be scraped.
         :return: Parsed JSON data.
         :rtype: object or list
         """
 
-        # Download.
+        with self._inflight_lock:
+            inflight = self._inflight.get(url)
+            is_leader = inflight is None
+
+            if is_leader:
+                inflight = self._inflight[url] = (Future(), _deadline.get())
+
+        future, deadline = inflight
+
+        if not is_leader:
+            try:
+                return future.result(self._get_remaining())
+            except FutureTimeoutError:
+                raise Exception("Couldn't download necessary data from the internet.")
+            except Exception:
+                if self._has_longer_deadline(deadline):
+                    return self._get_json(url)
+
+                raise
+
         try:
-            response = self.req_ses.get(url)
-        except:
-            raise Exception("Couldn't download necessary data from the internet.")
+            try:
+                data = self._download_json(url)
+            finally:
+                # Unregistered first so callers trying again don't
+                # wait for it again.
+                with self._inflight_lock:
+                    del self._inflight[url]
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+
+        future.set_result(data)
+
+        return data
+
+    def _download_json(self, url):
+        """
+        Downloads data for ``_get_json()``. If the host is failing (see
+        ``circuit_breaker``) or the request doesn't finish in time expired
+        cached data are returned if there are any.
+
+        :param str url: URL to be scraped.
+        :return: Parsed JSON data.
+        :rtype: object or list
+        """
+
+        ttl, entry = self._get_cache_entry(url)
+        key = self._get_stats_key(url) if self.stats else None
+
+        if entry and entry["expires"] > time.time():
+            if self.stats:
+                self.stats.on_cache(key, "hit")
+
+            return entry["data"]
+
+        if not self.circuit_breaker.allow(url):
+            return self._get_stale_data(key, entry)
+
+        # Download.
+        with self.deadline(self.req_deadline):
+            timeout = self._get_remaining()
+
+            if timeout is not None and timeout <= 0:
+                return self._get_stale_data(key, entry)
+
+            # Limited by the original URL (not the one of base_urls). Waiting
+            # for the rate limiter past the deadline makes no sense.
+            if not self.rate_limiter.acquire(url, timeout):
+                return self._get_stale_data(key, entry)
+
+            start = time.perf_counter()
+
+            try:
+                response = self._request_json(url, entry, key)
+            except:
+                self.circuit_breaker.record_failure(url)
+
+                return self._get_stale_data(key, entry)
+
+        if response.status_code in self.req_status_forcelist:
+            self.circuit_breaker.record_failure(url)
+
+            return self._get_stale_data(key, entry)
+
+        self.circuit_breaker.record_success(url)
+
+        if self.stats:
+            self.stats.on_request(
+                key, time.perf_counter() - start, len(response.content)
+            )
+
+        # Not modified - cached data are still valid.
+        if entry and 304 == response.status_code:
+            if self.stats:
+                self.stats.on_cache(key, "revalidated")
+
+            return self._set_cache_entry(
+                url, ttl, entry["data"], response.headers, entry=entry
+            )
+
+        if self.stats and ttl:
+            self.stats.on_cache(key, "miss")
 
         response.raise_for_status()
 
         # Parse.
+        start = time.perf_counter()
+
         try:
-            return response.json()
+            if self.json_loads:
+                data = self.json_loads(response.content)
+            else:
+                data = response.json()
         except:
             raise Exception("Couldn't parse downloaded data from the internet.")
 
+        if self.stats:
+            self.stats.on_parse(key, time.perf_counter() - start)
+
+        return self._set_cache_entry(
+            url, ttl, data, response.headers, len(response.content)
+        )
+
+    def _request_json(self, url, entry, key):
+        """
+        Requests the given URL (with retries) for ``_download_json()``.
+        Every attempt is bounded by the time left before the deadline.
+
+        :param str url: URL to be scraped.
+        :param dict entry: Expired cache entry or None.
+        :param str key: Stats key.
+        :raises Exception: If the URL couldn't be requested (in time).
+        :return: Response of the last attempt.
+        :rtype: requests.Response
+        """
+
+        import requests
+
+        wait = 0
+
+        for attempt in range(self.req_retries + 1):
+            if attempt:
+                time.sleep(wait)
+
+                if self.stats:
+                    self.stats.on_retry(key)
+                    self.stats.on_backoff(key, wait)
+
+                # The first attempt is rate limited by _download_json().
+                if not self.rate_limiter.acquire(url, self._get_remaining()):
+                    raise Exception(
+                        "Couldn't download necessary data from the internet."
+                    )
+
+            timeout = self._get_remaining()
+
+            if timeout is not None and timeout <= 0:
+                raise Exception("Couldn't download necessary data from the internet.")
+
+            # Download.
+            try:
+                response = self.req_ses.get(
+                    self._get_url(url),
+                    headers=self._get_cache_headers(entry),
+                    timeout=timeout,
+                )
+            except requests.RequestException:
+                wait = self.req_backoff_factor * 2**attempt
+
+                if attempt < self.req_retries and self._can_retry(wait):
+                    continue
+
+                raise Exception("Couldn't download necessary data from the internet.")
+
+            # Waits for 3s, 6s, 12s, 24s between requests
+            # unless the response says otherwise.
+            wait = self._get_retry_after(response.headers)
+
+            if wait is None:
+                wait = self.req_backoff_factor * 2**attempt
+
+            if (
+                response.status_code in self.req_status_forcelist
+                and attempt < self.req_retries
+                and self._can_retry(wait)
+            ):
+                continue
+
+            return response
+
+    async def _get_json_async(self, session, url):
+        """
+        Asynchronous counterpart of ``_get_json()``. Retries on the same
+        status codes and with the same backoff as the session returned
+        by ``get_session()`` (and honors Retry-After header the same way).
+
+        Concurrent calls for the same URL (within one event loop) are
+        coalesced the same way as in ``_get_json()``. Cancelling one
+        caller doesn't cancel the shared download.
+
+        :param aiohttp.ClientSession session: Session instance.
+        :param str url: URL to be scraped.
+        :return: Parsed JSON data.
+        :rtype: object or list
+        """
+
+        import asyncio
+
+        key = (asyncio.get_running_loop(), url)
+        inflight = self._inflight_async.get(key)
+        is_leader = inflight is None
+
+        if is_leader:
+            task = asyncio.ensure_future(self._download_json_async(session, url))
+            inflight = self._inflight_async[key] = (task, _deadline.get())
+
+            def done(task):
+                del self._inflight_async[key]
+
+                # Mark the exception as retrieved in case all callers
+                # were cancelled.
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(done)
+
+        task, deadline = inflight
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self._get_remaining())
+        except asyncio.TimeoutError:
+            raise Exception("Couldn't download necessary data from the internet.")
+        except Exception:
+            # The download is bounded by the deadline of the caller which
+            # started it.
+            if not is_leader and self._has_longer_deadline(deadline):
+                return await self._get_json_async(session, url)
+
+            raise
+
+    async def _download_json_async(self, session, url):
+        """
+        Downloads data for ``_get_json_async()`` - see ``_download_json()``.
+
+        :param aiohttp.ClientSession session: Session instance.
+        :param str url: URL to be scraped.
+        :return: Parsed JSON data.
+        :rtype: object or list
+        """
+
+        import aiohttp
+
+        ttl, entry = await self._run_cache_async(self._get_cache_entry, url)
+        key = self._get_stats_key(url) if self.stats else None
+
+        if entry and entry["expires"] > time.time():
+            if self.stats:
+                self.stats.on_cache(key, "hit")
+
+            return entry["data"]
+
+        if not self.circuit_breaker.allow(url):
+            return self._get_stale_data(key, entry)
+
+        with self.deadline(self.req_deadline):
+            remaining = self._get_remaining()
+
+            if remaining is not None and remaining <= 0:
+                return self._get_stale_data(key, entry)
+
+            if not await self.rate_limiter.acquire_async(url, remaining):
+                return self._get_stale_data(key, entry)
+
+            try:
+                data = await self._request_json_async(session, url, ttl, entry, key)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in self.req_status_forcelist:
+                    self.circuit_breaker.record_success(url)
+                    raise
+
+                self.circuit_breaker.record_failure(url)
+
+                return self._get_stale_data(key, entry)
+            except Exception:
+                self.circuit_breaker.record_failure(url)
+
+                return self._get_stale_data(key, entry)
+
+        self.circuit_breaker.record_success(url)
+
+        return data
+
+    async def _request_json_async(self, session, url, ttl, entry, key):
+        """
+        Requests the given URL (with retries) for ``_download_json_async()``.
+
+        :param aiohttp.ClientSession session: Session instance.
+        :param str url: URL to be scraped.
+        :param int ttl: Cache TTL of the URL.
+        :param dict entry: Expired cache entry or None.
+        :param str key: Stats key.
+        :return: Parsed JSON data.
+        :rtype: object or list
+        """
+
+        import asyncio
+
+        import aiohttp
+
+        start = time.perf_counter()
+        wait = 0
+
+        for attempt in range(self.req_retries + 1):
+            if attempt:
+                await asyncio.sleep(wait)
+
+                if self.stats:
+                    self.stats.on_retry(key)
+                    self.stats.on_backoff(key, wait)
+
+                # The first attempt is rate limited by _download_json_async().
+                if not await self.rate_limiter.acquire_async(
+                    url, self._get_remaining()
+                ):
+                    raise Exception(
+                        "Couldn't download necessary data from the internet."
+                    )
+
+            timeout = self._get_remaining()
+
+            if timeout is not None and timeout <= 0:
+                raise Exception("Couldn't download necessary data from the internet.")
+
+            # Download.
+            try:
+                async with session.get(
+                    self._get_url(url),
+                    headers=self._get_cache_headers(entry),
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                ) as response:
+                    # Waits for 3s, 6s, 12s, 24s between requests
+                    # unless the response says otherwise.
+                    wait = self._get_retry_after(response.headers)
+
+                    if wait is None:
+                        wait = self.req_backoff_factor * 2**attempt
+
+                    if (
+                        response.status in self.req_status_forcelist
+                        and attempt < self.req_retries
+                        and self._can_retry(wait)
+                    ):
+                        continue
+
+                    # Not modified - cached data are still valid.
+                    if entry and 304 == response.status:
+                        if self.stats:
+                            self.stats.on_request(key, time.perf_counter() - start, 0)
+                            self.stats.on_cache(key, "revalidated")
+
+                        return await self._run_cache_async(
+                            self._set_cache_entry,
+                            url,
+                            ttl,
+                            entry["data"],
+                            response.headers,
+                            0,
+                            entry,
+                        )
+
+                    if self.stats and ttl:
+                        self.stats.on_cache(key, "miss")
+
+                    response.raise_for_status()
+                    body = await response.read()
+                    headers = response.headers
+            except aiohttp.ClientResponseError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                wait = self.req_backoff_factor * 2**attempt
+
+                if attempt < self.req_retries and self._can_retry(wait):
+                    continue
+
+                raise Exception("Couldn't download necessary data from the internet.")
+
+            parse_start = time.perf_counter()
+
+            # Parse.
+            try:
+                data = (self.json_loads or json.loads)(body)
+            except:
+                raise Exception("Couldn't parse downloaded data from the internet.")
+
+            if self.stats:
+                self.stats.on_request(key, parse_start - start, len(body))
+                self.stats.on_parse(key, time.perf_counter() - parse_start)
+
+            return await self._run_cache_async(
+                self._set_cache_entry, url, ttl, data, headers, len(body)
+            )
+
+    async def _run_cache_async(self, func, *args):
+        """
+        Runs the given cache access function. Caches other than
+        ``MemoryCache`` may block (disk I/O) so they are accessed
+        outside of the event loop.
+
+        :param callable func: Function (``_get_cache_entry()`` or
+                              ``_set_cache_entry()``).
+        :return: Result of the function.
+        """
+
+        if not self.cache or isinstance(self.cache, MemoryCache):
+            return func(*args)
+
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _run_store_async(self, func, *args):
+        """
+        Runs the given historical data function. With ``store`` set it
+        loads or saves files so it runs outside of the event loop.
+
+        :param callable func: Function (``_get_historical_data_request()`` or
+                              ``_get_historical_data_df()``).
+        :return: Result of the function.
+        """
+
+        if not self.store:
+            return func(*args)
+
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _has_longer_deadline(self, deadline):
+        """
+        Checks the current deadline (see ``deadline()``) is later than
+        the given one.
+
+        :param float deadline: Deadline (monotonic time) or None.
+        :return: True if there is more time than the given deadline allows.
+        :rtype: bool
+        """
+
+        current = _deadline.get()
+
+        return deadline is not None and (current is None or current > deadline)
+
+    def _get_remaining(self):
+        """
+        Returns seconds left before the current deadline - see ``deadline()``.
+
+        :return: Seconds (may be negative) or None if there is no deadline.
+        :rtype: float or None
+        """
+
+        deadline = _deadline.get()
+
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _can_retry(self, wait):
+        """
+        Checks a retry after the given wait would still be made before
+        the current deadline.
+
+        :param float wait: Seconds to wait before the retry.
+        :return: True if the retry can be made.
+        :rtype: bool
+        """
+
+        remaining = self._get_remaining()
+
+        return remaining is None or wait < remaining
+
+    def _get_retry_after(self, headers):
+        """
+        Parses Retry-After response header.
+
+        :param headers: Response headers.
+        :return: Seconds to wait or None if the header is missing or invalid.
+        :rtype: float or None
+        """
+
+        from email.utils import parsedate_to_datetime
+
+        value = headers.get("Retry-After")
+
+        if not value:
+            return None
+
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            return None
+
+    def _get_stale_data(self, key, entry):
+        """
+        Returns expired cached data when fresh data can't be downloaded.
+
+        :param str key: Stats key.
+        :param dict entry: Expired cache entry or None.
+        :raises Exception: If there are no cached data.
+        :return: Cached data.
+        :rtype: object or list
+        """
+
+        if entry is None:
+            raise Exception("Couldn't download necessary data from the internet.")
+
+        if self.stats:
+            self.stats.on_cache(key, "stale")
+
+        return entry["data"]
+
+    def _with_context(self, func):
+        """
+        Wraps the given function so it runs in a copy of the current
+        context - worker threads then keep the caller's deadline (see
+        ``deadline()``).
+
+        :param callable func: Function.
+        :return: Wrapped function.
+        :rtype: callable
+        """
+
+        context = copy_context()
+
+        return lambda *args: context.copy().run(func, *args)
+
+    def _get_url(self, url):
+        """
+        Returns URL the request is actually sent to - see ``base_urls``.
+        Caching and rate limiting are still keyed by the original URL.
+
+        :param str url: Original URL.
+        :return: URL with overridden base or the original URL.
+        :rtype: str
+        """
+
+        if not self.base_urls:
+            return url
+
+        parts = urlsplit(url)
+        base_url = self.base_urls.get(parts.hostname)
+
+        if base_url is None:
+            return url
+
+        return base_url.rstrip("/") + url[len(f"{parts.scheme}://{parts.netloc}") :]
+
+    def _get_stats_key(self, url):
+        """
+        Returns name metrics of the given URL are recorded under - endpoint
+        class or host if the endpoint is unknown.
+
+        :param str url: URL.
+        :return: Endpoint class name or host.
+        :rtype: str
+        """
+
+        return self._get_endpoint(url) or urlsplit(url).hostname
+
+    def _get_endpoint(self, url):
+        """
+        Determines endpoint class of the given URL - see ``endpoints``.
+
+        :param str url: URL.
+        :return: Endpoint class name or None if unknown.
+        :rtype: str or None
+        """
+
+        path = urlsplit(url).path
+
+        for name, pattern in self.endpoints:
+            if pattern.search(path):
+                return name
+
+        return None
+
+    def _get_cache_entry(self, url):
+        """
+        Looks up cached response for the given URL. Expired entries
+        are returned as well so they can be revalidated.
+
+        :param str url: URL.
+        :return: Tuple where first is TTL for the URL (0 if the URL
+                 shouldn't be cached) and second cache entry or None.
+        :rtype: tuple
+        """
+
+        if not self.cache:
+            return 0, None
+
+        ttl = self.cache_ttls.get(self._get_endpoint(url), 0)
+
+        if not ttl:
+            return 0, None
+
+        return ttl, self.cache.get(url)
+
+    def _get_cache_headers(self, entry):
+        """
+        Returns conditional request headers for the given cache entry.
+
+        :param dict entry: Cache entry or None.
+        :return: Request headers.
+        :rtype: dict
+        """
+
+        headers = {}
+
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def _set_cache_entry(self, url, ttl, data, headers, size=0, entry=None):
+        """
+        Caches the given response data (if the URL should be cached).
+
+        :param str url: URL.
+        :param int ttl: TTL in seconds - 0 means no caching.
+        :param data: Parsed response data.
+        :param headers: Response headers.
+        :param int size: Size of the response body in bytes (used by cache
+                         byte budget).
+        :param dict entry: Revalidated cache entry validators (and size) are
+                           taken from if the response doesn't contain them.
+        :return: The given data.
+        :rtype: object or list
+        """
+
+        if ttl:
+            entry = entry or {"etag": None, "last_modified": None}
+            self.cache.set(
+                url,
+                {
+                    "data": data,
+                    "expires": time.time() + ttl,
+                    "etag": headers.get("ETag") or entry["etag"],
+                    "last_modified": headers.get("Last-Modified")
+                    or entry["last_modified"],
+                    "size": size or entry.get("size", 0),
+                },
+            )
+
+        return data
+
+    def _fetch_historical_data_many(self, symbols, ids, concurrency, convert=None):
+        """
+        Downloads historical data for many coins concurrently - see
+        ``fetch_crypto_historical_data_many()``.
+
+        :param list symbols: Coin symbols - i.e. BTC, ETH, ...
+        :param list ids: Coin IDs (based on coingecko.com).
+        :param int concurrency: Max number of concurrent requests.
+        :param callable convert: Optional function every coin dataframe is
+                                 converted by right after it's downloaded.
+        :raises AttributeError: If symbols and ids params are empty.
+        :return: Tuple where first is dict of (converted) dataframes by coin
+                 ID and second is dict of errors (by coin symbol or ID).
+        :rtype: tuple
+        """
+
+        import asyncio
+
+        import aiohttp
+
+        if (not symbols and not ids) or (symbols and ids):
+            raise AttributeError('Please hand "symbols" or "ids" param.')
+
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+
+        errors = {}
+
+        # Resolve symbols to IDs.
+        if symbols:
+            ids = []
+
+            for symbol in symbols:
+                try:
+                    ids.append(self._get_coin_id_from_params(symbol=symbol))
+                except Exception as e:
+                    errors[symbol] = e
+
+        async def fetch_all():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch_one(session, id):
+                url, stored = await self._run_store_async(
+                    self._get_historical_data_request, id
+                )
+
+                async with semaphore:
+                    data = await self._get_json_async(session, url)
+
+                df = await self._run_store_async(
+                    self._get_historical_data_df, id, data, stored
+                )
+
+                return convert(df) if convert else df
+
+            async with aiohttp.ClientSession() as session:
+                return await asyncio.gather(
+                    *[fetch_one(session, id) for id in ids], return_exceptions=True
+                )
+
+        frames = {}
+
+        for id, result in zip(ids, asyncio.run(fetch_all())):
+            if isinstance(result, Exception):
+                errors[id] = result
+            else:
+                frames[id] = result
+
+        return frames, errors
+
+    def _get_panel_coin(self, df, dtype):
+        """
+        Converts coin dataframe to compact arrays for ``_get_panel()``.
+
+        :param pd.DataFrame df: Dataframe with historical data.
+        :param str dtype: Values dtype.
+        :return: Tuple where first is datetime64[ns] index array and second
+                 days x fields values array.
+        :rtype: tuple
+        """
+
+        return (
+            df.index.values.astype("datetime64[ns]"),
+            df[["price", "market_cap", "total_volume"]].to_numpy(dtype=dtype),
+        )
+
+    def _get_panel(self, coins, dtype):
+        """
+        Assemblies panel dataframe - see
+        ``fetch_crypto_historical_data_panel()``.
+
+        :param dict coins: Coin ID -> compact arrays (see ``_get_panel_coin()``).
+        :param str dtype: Values dtype.
+        :return: Panel dataframe.
+        :rtype: pd.DataFrame
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        fields = ["price", "market_cap", "total_volume"]
+        ids = list(coins)
+
+        if coins:
+            index = np.unique(np.concatenate([i for i, _ in coins.values()]))
+        else:
+            index = np.array([], dtype="datetime64[ns]")
+
+        # One column-major block (pandas' own layout so it isn't copied)
+        # with (field, coin) columns - every coin is placed on the common
+        # index right away.
+        values = np.full(
+            (len(index), len(fields) * len(ids)), np.nan, dtype=dtype, order="F"
+        )
+
+        for j, (coin_index, coin_values) in enumerate(coins.values()):
+            if not len(coin_index):
+                continue
+
+            rows = np.searchsorted(index, coin_index)
+
+            # Days without gaps (the usual case) are a plain slice.
+            if rows[-1] - rows[0] + 1 == len(rows):
+                rows = slice(rows[0], rows[-1] + 1)
+
+            for f in range(len(fields)):
+                values[rows, f * len(ids) + j] = coin_values[:, f]
+
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(index),
+            columns=pd.MultiIndex.from_product([fields, ids]),
+            copy=False,
+        )
+
+    def _market_chart_to_df(self, data):
+        """
+        Assemblies historical dataframe from coingecko.com market chart data.
+
+        :param dict data: Market chart data with ``prices``, ``market_caps``
+                          and ``total_volumes`` keys.
+        :raises Exception: If data are incomplete.
+        :return: Dataframe with historical data.
+        :rtype: pd.DataFrame
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        if (
+            "prices" not in data
+            or "market_caps" not in data
+            or "total_volumes" not in data
+        ):
+            raise Exception("Couldn't download necessary data from the internet.")
+
+        # Assembly the dataframe - all series go to one preallocated
+        # block (laid out the way pandas stores it) without any joins.
+        columns = ("prices", "market_caps", "total_volumes")
+        timestamps = [
+            np.fromiter(map(itemgetter(0), data[c]), np.int64, len(data[c]))
+            for c in columns
+        ]
+
+        if all(np.array_equal(timestamps[0], t) for t in timestamps[1:]):
+            index = timestamps[0]
+            positions = [slice(None)] * len(columns)
+        else:
+            # Series are not aligned - place them on a common index.
+            index = np.unique(np.concatenate(timestamps))
+            positions = [np.searchsorted(index, t) for t in timestamps]
+
+        values = np.full((len(columns), len(index)), np.nan)
+
+        for i, c in enumerate(columns):
+            try:
+                values[i, positions[i]] = np.fromiter(
+                    map(itemgetter(1), data[c]), np.float64, len(data[c])
+                )
+            except TypeError:
+                # Null values.
+                values[i, positions[i]] = np.array(
+                    [v[1] for v in data[c]], dtype=np.float64
+                )
+
+        # Timestamps are in ms, index is normalized to days.
+        day = 24 * 3600 * 1000
+        index = (index // day * day * 1000000).view("datetime64[ns]")
+        index = pd.DatetimeIndex(index)
+
+        return pd.DataFrame(
+            values.T,
+            index=index,
+            columns=["price", "market_cap", "total_volume"],
+            copy=False,
+        )
+
+    def _get_historical_data_request(self, id):
+        """
+        Determines URL historical data should be downloaded from. If there
+        is a store only the missing tail of the data is requested.
+
+        :param str id: Coin ID (based on coingecko.com).
+        :return: Tuple where first is URL and second already stored
+                 dataframe (or None).
+        :rtype: tuple
+        """
+
+        stored = self.store.load(id) if self.store else None
+
+        if stored is None or 0 == len(stored):
+            # Bounded query - download just the requested range (with one day
+            # margin on both sides as timestamps are in local time). Store
+            # needs the whole history though.
+            if self.start and not self.store:
+                from_ts = date_to_timestamp(self.start - timedelta(days=1))
+                to_ts = (
+                    date_to_timestamp(self.end + timedelta(days=2))
+                    if self.end
+                    else self._get_range_end()
+                )
+
+                return (
+                    f"https://api.coingecko.com/api/v3/coins/{id}/market_chart/range?vs_currency=usd&from={from_ts}&to={to_ts}",
+                    None,
+                )
+
+            return (
+                f"https://api.coingecko.com/api/v3/coins/{id}/market_chart?vs_currency=usd&days=max",
+                None,
+            )
+
+        # Last stored day may be incomplete so it's downloaded again.
+        from_ts = int(stored.index[-1].timestamp())
+        to_ts = self._get_range_end()
+
+        return (
+            f"https://api.coingecko.com/api/v3/coins/{id}/market_chart/range?vs_currency=usd&from={from_ts}&to={to_ts}",
+            stored,
+        )
+
+    def _get_range_end(self):
+        """
+        Returns end timestamp of open-ended range queries. Current time
+        is rounded up to the market chart cache TTL so the URL (cache
+        key) stays the same while the cached response is valid.
+
+        :return: Timestamp.
+        :rtype: int
+        """
+
+        step = self.cache_ttls.get("market_chart") or 1
+
+        return -(-int(time.time()) // step) * step
+
+    def _get_historical_data_df(self, id, data, stored=None):
+        """
+        Assemblies historical dataframe from downloaded data, merges it
+        with already stored data, updates the store and limits the result
+        by start/end dates.
+
+        :param str id: Coin ID (based on coingecko.com).
+        :param dict data: Downloaded market chart data.
+        :param pd.DataFrame stored: Already stored dataframe (or None).
+        :return: Dataframe with historical data.
+        :rtype: pd.DataFrame
+        """
+
+        import pandas as pd
+
+        if stored is not None and 0 == len(data.get("prices", [])):
+            # Nothing new.
+            df = stored
+        else:
+            df = self._market_chart_to_df(data)
+
+        # Range responses (bounded query or store update) of short ranges
+        # come in hourly granularity - keep the first record of each day.
+        # Full history keeps its last row with the current price.
+        if self.start or self.store:
+            df = df[~df.index.duplicated()]
+
+        if self.store:
+            if stored is not None and df is not stored:
+                df = pd.concat([stored[stored.index < df.index[0]], df], axis=0)
+
+            self.store.save(id, df)
+
+        # Check if data are limited and if yes drop the unwanted data.
+        if self.start:
+            df = df[df.index >= pd.Timestamp(self.start)]
+
+        if self.end:
+            df = df[df.index <= pd.Timestamp(self.end)]
+
+        return df
+
+    def _get_coin_ids_index(self):
+        """
+        Returns symbol -> coin ID's index built from coingecko.com
+        coin list. The index is shared across all instances and threads
+        and gets rebuilt once it's older than ``coin_ids_ttl`` seconds.
+
+        :return: Dict where keys are upper-cased symbols and values tuples of ID's.
+        :rtype: dict
+        """
+
+        index = self._get_fresh_coin_ids_index()
+
+        if index is None:
+            with Karpet._coin_ids_lock:
+                index = self._get_fresh_coin_ids_index()
+
+                if index is None:
+                    index = self._set_coin_ids_index(
+                        self._get_json("https://api.coingecko.com/api/v3/coins/list")
+                    )
+
+        return index
+
+    def _get_fresh_coin_ids_index(self):
+        """
+        Returns the shared symbol -> coin ID's index if it's built and
+        not older than ``coin_ids_ttl`` seconds. The index and its build
+        time are published together so no lock is needed.
+
+        :return: Index or None.
+        :rtype: dict or None
+        """
+
+        published = Karpet._coin_ids_index
+
+        if published is None or time.monotonic() - published[0] > self.coin_ids_ttl:
+            return None
+
+        return published[1]
+
+    def _set_coin_ids_index(self, response_data):
+        """
+        Builds the shared symbol -> coin ID's index from coingecko.com
+        coin list.
+
+        :param list response_data: Downloaded coin list.
+        :return: The index.
+        :rtype: dict
+        """
+
+        index = {}
+
+        for coin in response_data:
+            index.setdefault(coin["symbol"].upper(), []).append(coin["id"])
+
+        index = {k: tuple(v) for k, v in index.items()}
+        Karpet._coin_ids_index = (time.monotonic(), index)
+
+        return index
+
+    def _get_exchanges_index(self):
+        """
+        Returns exchange listings indexes built from cryptocompare.com
+        all-pairs exchanges data. The indexes are shared across all
+        instances and threads and get rebuilt once they're older than
+        ``exchanges_ttl`` seconds.
+
+        :return: Tuple where first is dict of upper-cased symbol -> tuple
+                 of exchanges and second dict of exchange -> tuple of symbols.
+        :rtype: tuple
+        """
+
+        index = self._get_fresh_exchanges_index()
+
+        if index is None:
+            with Karpet._exchanges_lock:
+                index = self._get_fresh_exchanges_index()
+
+                if index is None:
+                    index = self._set_exchanges_index(
+                        self._get_json(
+                            "https://min-api.cryptocompare.com/data/v4/all/exchanges"
+                        )
+                    )
+
+        return index
+
+    def _get_fresh_exchanges_index(self):
+        """
+        Returns the shared exchange listings indexes if they're built and
+        not older than ``exchanges_ttl`` seconds. The indexes and their
+        build time are published together so no lock is needed.
+
+        :return: Indexes (see ``_get_exchanges_index()``) or None.
+        :rtype: tuple or None
+        """
+
+        published = Karpet._exchanges_index
+
+        if published is None or time.monotonic() - published[0] > self.exchanges_ttl:
+            return None
+
+        return published[1]
+
+    def _set_exchanges_index(self, response_data):
+        """
+        Builds the shared exchange listings indexes from cryptocompare.com
+        all-pairs exchanges data.
+
+        :param dict response_data: Downloaded exchanges data.
+        :raises Exception: If the response is not successful.
+        :return: The indexes (see ``_get_exchanges_index()``).
+        :rtype: tuple
+        """
+
+        exchanges = self._exchanges_from_data(response_data)
+        symbols = {}
+        exchange_symbols = {}
+
+        for exchange in exchanges:
+            pairs = response_data["Data"]["exchanges"][exchange].get("pairs") or {}
+            exchange_symbols[exchange] = tuple(pairs)
+
+            for symbol in pairs:
+                symbols.setdefault(symbol.upper(), []).append(exchange)
+
+        index = ({k: tuple(v) for k, v in symbols.items()}, exchange_symbols)
+        Karpet._exchanges_index = (time.monotonic(), index)
+
+        return index
+
+    def _get_search_index(self, data):
+        """
+        Returns search index of the given quick search data - the index
+        is rebuilt just if the data are not the indexed ones.
+
+        :param list data: Quick search data.
+        :return: Search index.
+        :rtype: karpet.search.CoinSearchIndex
+        """
+
+        index = self._search_index
+
+        if index is None or index.data is not data:
+            with self._search_index_lock:
+                index = self._search_index
+
+                if index is None or index.data is not data:
+                    index = self._search_index = CoinSearchIndex(data)
+
+        return index
+
     def _get_coin_id_from_params(self, symbol=None, id=None):
         """
         Handles incoming symbol and id params and retuirns
@@ -718,7 +2549,7 @@ class Karpet:
             return id
 
         # Symbol.
-        ids = self.get_coin_ids(symbol)
+        ids = self._get_coin_ids_index().get(symbol.upper(), ())
 
         if 1 < len(ids):
             raise Exception(
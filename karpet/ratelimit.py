@@ -0,0 +1,147 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Requests over the allowed rate
+    are not rejected but queued - the caller gets the time it
+    has to wait for its token. Callers with limited time don't
+    take the token if they couldn't wait for it.
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Constructor.
+
+        :param float rate: Number of requests per second.
+        :param int burst: Max number of requests that can be made at once.
+        """
+
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1.")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """
+        Takes one token from the bucket.
+
+        :param float max_wait: Max number of seconds the caller can wait.
+                               The token is not taken if the wait is longer.
+        :return: Number of seconds the caller has to wait before the request
+                 or None if it's longer than ``max_wait``.
+        :rtype: float or None
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0
+
+            if max_wait is not None and wait > max_wait:
+                return None
+
+            self._tokens -= 1
+
+            return wait
+
+    def acquire(self, max_wait=None):
+        """
+        Blocks until a request can be made.
+
+        :param float max_wait: Max number of seconds to wait.
+        :return: False if the wait would be longer than ``max_wait``.
+        :rtype: bool
+        """
+
+        wait = self.reserve(max_wait)
+
+        if wait:
+            time.sleep(wait)
+
+        return wait is not None
+
+    async def acquire_async(self, max_wait=None):
+        """
+        Waits (without blocking the event loop) until a request can be made.
+
+        :param float max_wait: Max number of seconds to wait.
+        :return: False if the wait would be longer than ``max_wait``.
+        :rtype: bool
+        """
+
+        import asyncio
+
+        wait = self.reserve(max_wait)
+
+        if wait:
+            await asyncio.sleep(wait)
+
+        return wait is not None
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter with one token bucket per host.
+    Hosts without configured rate are not limited.
+    """
+
+    # Host -> (requests per second, burst).
+    default_rates = {
+        "api.coingecko.com": (0.5, 5),
+        "min-api.cryptocompare.com": (20, 20),
+        "coincodex.com": (5, 5),
+    }
+
+    def __init__(self, rates=None):
+        """
+        Constructor.
+
+        :param dict rates: Host -> (requests per second, burst) dict.
+                           Defaults to ``default_rates``.
+        """
+
+        if rates is None:
+            rates = self.default_rates
+
+        self.buckets = {
+            host: TokenBucket(rate, burst) for host, (rate, burst) in rates.items()
+        }
+
+    def acquire(self, url, max_wait=None):
+        """
+        Blocks until a request to the given URL can be made.
+
+        :param str url: Request URL.
+        :param float max_wait: Max number of seconds to wait.
+        :return: False if the wait would be longer than ``max_wait``.
+        :rtype: bool
+        """
+
+        bucket = self.buckets.get(urlsplit(url).hostname)
+
+        return bucket.acquire(max_wait) if bucket else True
+
+    async def acquire_async(self, url, max_wait=None):
+        """
+        Waits (without blocking the event loop) until a request
+        to the given URL can be made.
+
+        :param str url: Request URL.
+        :param float max_wait: Max number of seconds to wait.
+        :return: False if the wait would be longer than ``max_wait``.
+        :rtype: bool
+        """
+
+        bucket = self.buckets.get(urlsplit(url).hostname)
+
+        return await bucket.acquire_async(max_wait) if bucket else True
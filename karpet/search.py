@@ -0,0 +1,152 @@
+import re
+from bisect import bisect_left
+
+
+class CoinSearchIndex:
+    """
+    Prefix search index over coinmarketcap.com quick search data (see
+    ``Karpet.search_coins()``). Searched strings (name, symbol, slug,
+    tokens and their words) are kept in one sorted list so all keys
+    starting with the query are one range found by binary search.
+
+    Coins are numbered by rank so ordering matches is just sorting
+    numbers. The index is immutable and so thread-safe.
+    """
+
+    # Letters tried by typo tolerant search.
+    alphabet = "abcdefghijklmnopqrstuvwxyz0123456789"
+    word_separator = re.compile(r"[\W_]+")
+
+    def __init__(self, data):
+        """
+        Constructor.
+
+        :param list data: Quick search data (see ``Karpet.get_quick_search_data()``).
+        """
+
+        self.data = data
+
+        # Ranked coins first, the rest keeps its order.
+        self.coins = sorted(
+            data, key=lambda c: (c.get("rank") is None, c.get("rank") or 0)
+        )
+        self.exact = {}  # Key -> coin numbers (ascending).
+        pairs = set()
+
+        for number, coin in enumerate(self.coins):
+            fields = [coin.get("name"), coin.get("symbol"), coin.get("slug")]
+            fields += coin.get("tokens") or []
+            keys = {self.normalize(f) for f in fields if f} - {""}
+
+            for key in keys:
+                self.exact.setdefault(key, []).append(number)
+                pairs.add((key, number))
+
+                # Words so i.e. "Shiba Inu" is found by "inu" as well.
+                for word in self.word_separator.split(key):
+                    if word and word != key:
+                        pairs.add((word, number))
+
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.numbers = [number for _, number in pairs]
+
+    def search(self, query, limit=10, fuzzy=False):
+        """
+        Searches coins by prefix of their name, symbol, slug or tokens.
+        Exact matches go first, then prefix matches and then (if fuzzy)
+        matches with one typo - each group ordered by rank.
+
+        :param str query: Searched text (case insensitive).
+        :param int limit: Max number of coins.
+        :param bool fuzzy: Tolerate one typo (missing, extra, wrong or swapped
+                           letter) if there are not enough matches. Applies to
+                           queries of 3+ letters.
+        :return: List of quick search data items.
+        :rtype: list
+        """
+
+        query = self.normalize(query)
+
+        if not query or limit < 1:
+            return []
+
+        numbers = self.exact.get(query, [])[:limit]
+
+        if len(numbers) < limit:
+            found = set(self._find_prefix(query)).difference(numbers)
+            numbers += sorted(found)[: limit - len(numbers)]
+
+        if fuzzy and len(numbers) < limit and len(query) >= 3:
+            found = set()
+
+            for variant in self._get_typo_variants(query):
+                found.update(self._find_prefix(variant))
+
+            found.difference_update(numbers)
+            numbers += sorted(found)[: limit - len(numbers)]
+
+        return [self.coins[n] for n in numbers]
+
+    def normalize(self, text):
+        """
+        Normalizes the given text for searching.
+
+        :param str text: Text.
+        :return: Case folded text without surrounding whitespace.
+        :rtype: str
+        """
+
+        return str(text).strip().casefold()
+
+    def _find_prefix(self, prefix):
+        """
+        Finds coins with a key starting with the given prefix.
+
+        :param str prefix: Normalized prefix.
+        :return: List of coin numbers (may contain duplicates).
+        :rtype: list
+        """
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+
+        return self.numbers[start:end]
+
+    def _get_typo_variants(self, query):
+        """
+        Generates all texts one typo away from the given query
+        which are prefix of some key.
+
+        :param str query: Normalized query.
+        :return: Set of variants.
+        :rtype: set
+        """
+
+        variants = set()
+
+        for i in range(len(query)):
+            variants.add(query[:i] + query[i + 1 :])
+
+            if i < len(query) - 1:
+                variants.add(query[:i] + query[i + 1] + query[i] + query[i + 2 :])
+
+            for c in self.alphabet:
+                variants.add(query[:i] + c + query[i + 1 :])
+                variants.add(query[:i] + c + query[i:])
+
+        variants.discard(query)
+
+        return {v for v in variants if v and self._has_prefix(v)}
+
+    def _has_prefix(self, prefix):
+        """
+        Checks some key starts with the given prefix.
+
+        :param str prefix: Normalized prefix.
+        :rtype: bool
+        """
+
+        i = bisect_left(self.keys, prefix)
+
+        return i < len(self.keys) and self.keys[i].startswith(prefix)
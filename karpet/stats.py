@@ -0,0 +1,161 @@
+import threading
+from bisect import bisect_left
+
+
+class Stats:
+    """
+    Thread-safe request metrics collected per endpoint (see
+    ``Karpet.endpoints`` - unknown URLs are keyed by host). Karpet
+    calls the ``on_*`` methods so any object with the same methods
+    can be used instead (i.e. to forward metrics elsewhere).
+
+    Recording is just a few additions under a lock so it can be
+    left on in production.
+    """
+
+    # Upper bounds (seconds) of latency histogram buckets.
+    latency_buckets = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, latency_buckets=None):
+        """
+        Constructor.
+
+        :param tuple latency_buckets: Sorted upper bounds (seconds) of latency
+                                      histogram buckets. Defaults to
+                                      ``latency_buckets``.
+        """
+
+        if latency_buckets is not None:
+            self.latency_buckets = tuple(latency_buckets)
+
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def on_request(self, endpoint, latency, size):
+        """
+        Records one finished request (including retries).
+
+        :param str endpoint: Endpoint name.
+        :param float latency: Seconds the request took.
+        :param int size: Response size in bytes.
+        """
+
+        bucket = bisect_left(self.latency_buckets, latency)
+
+        with self._lock:
+            e = self._get_endpoint(endpoint)
+            e["requests"] += 1
+            e["latency_sum"] += latency
+            e["latency_counts"][bucket] += 1
+            e["bytes"] += size
+
+    def on_retry(self, endpoint):
+        """
+        Records one retried request.
+
+        :param str endpoint: Endpoint name.
+        """
+
+        with self._lock:
+            self._get_endpoint(endpoint)["retries"] += 1
+
+    def on_backoff(self, endpoint, seconds):
+        """
+        Records time slept before a retry.
+
+        :param str endpoint: Endpoint name.
+        :param float seconds: Seconds slept.
+        """
+
+        with self._lock:
+            self._get_endpoint(endpoint)["backoff_time"] += seconds
+
+    def on_cache(self, endpoint, result):
+        """
+        Records one cache lookup.
+
+        :param str endpoint: Endpoint name.
+        :param str result: "hit", "miss", "revalidated" (304 response) or
+                           "stale" (expired data served as the host is failing).
+        """
+
+        with self._lock:
+            self._get_endpoint(endpoint)[f"cache_{result}"] += 1
+
+    def on_parse(self, endpoint, seconds):
+        """
+        Records time spent by parsing a response.
+
+        :param str endpoint: Endpoint name.
+        :param float seconds: Seconds the parsing took.
+        """
+
+        with self._lock:
+            e = self._get_endpoint(endpoint)
+            e["parse_count"] += 1
+            e["parse_time"] += seconds
+
+    def snapshot(self):
+        """
+        Returns a copy of collected metrics. Latency histogram
+        is cumulative (Prometheus style) - number of requests
+        which took at most the given seconds.
+
+        :return: Dict where keys are endpoint names and values dicts of metrics.
+        :rtype: dict
+        """
+
+        bounds = self.latency_buckets + (float("inf"),)
+        snapshot = {}
+
+        with self._lock:
+            for name, e in self._endpoints.items():
+                snapshot[name] = {k: v for k, v in e.items() if "latency_counts" != k}
+                total = 0
+                histogram = {}
+
+                for bound, count in zip(bounds, e["latency_counts"]):
+                    total += count
+                    histogram[bound] = total
+
+                snapshot[name]["latency_histogram"] = histogram
+
+        return snapshot
+
+    def reset(self):
+        """
+        Drops all collected metrics.
+        """
+
+        with self._lock:
+            self._endpoints.clear()
+
+    def _get_endpoint(self, endpoint):
+        """
+        Returns metrics of the given endpoint. Must be called
+        with the lock held.
+
+        :param str endpoint: Endpoint name.
+        :return: Dict of metrics.
+        :rtype: dict
+        """
+
+        try:
+            return self._endpoints[endpoint]
+        except KeyError:
+            e = self._endpoints[endpoint] = {
+                "requests": 0,
+                "latency_sum": 0.0,
+                "latency_counts": [0] * (len(self.latency_buckets) + 1),
+                "bytes": 0,
+                "retries": 0,
+                "backoff_time": 0.0,
+                "cache_hit": 0,
+                "cache_miss": 0,
+                "cache_revalidated": 0,
+                "cache_stale": 0,
+                "parse_count": 0,
+                "parse_time": 0.0,
+            }
+
+            return e
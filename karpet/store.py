@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+
+class HistoryStore:
+    """
+    Persistent store of historical coin data. Every coin ID is kept
+    in its own columnar ``.npz`` file (datetime index + one float64
+    block with all the columns) in the given directory.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor.
+
+        :param str path: Directory the data are stored in. Created if missing.
+        """
+
+        self.path = os.path.expanduser(path)
+        os.makedirs(self.path, exist_ok=True)
+
+    def load(self, id):
+        """
+        Loads stored data for the given coin ID.
+
+        :param str id: Coin ID (based on coingecko.com).
+        :return: Stored dataframe or None if nothing is stored yet.
+        :rtype: pd.DataFrame or None
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        try:
+            with np.load(self._get_file(id), allow_pickle=False) as f:
+                return pd.DataFrame(
+                    f["values"],
+                    index=pd.DatetimeIndex(f["index"].astype("datetime64[ns]")),
+                    columns=list(f["columns"]),
+                )
+        except FileNotFoundError:
+            return None
+
+    def save(self, id, df):
+        """
+        Stores data for the given coin ID. Already stored data
+        are replaced.
+
+        :param str id: Coin ID (based on coingecko.com).
+        :param pd.DataFrame df: Dataframe with historical data.
+        """
+
+        import numpy as np
+
+        # Write to a temporary file first so readers never see
+        # a half-written file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    index=df.index.values.astype("datetime64[ns]").astype(np.int64),
+                    values=df.values.astype(np.float64),
+                    columns=np.array(df.columns, dtype=str),
+                )
+
+            os.replace(tmp_path, self._get_file(id))
+        except:
+            os.remove(tmp_path)
+            raise
+
+    def _get_file(self, id):
+        """
+        Returns path of the file for the given coin ID.
+
+        :param str id: Coin ID (based on coingecko.com).
+        :return: File path.
+        :rtype: str
+        """
+
+        return os.path.join(self.path, f"{id}.npz")
@@ -1,4 +1,5 @@
 import time
+from html.parser import HTMLParser
 
 
 def date_to_timestamp(date):
@@ -11,3 +12,174 @@ def date_to_timestamp(date):
     """
 
     return int(time.mktime(date.timetuple()))
+
+
+def stitch_trend_batches(batches, kw_list):
+    """
+    Stitches overlapping Google trends searches into one series.
+
+    The first batch is taken as is. Every next batch is scaled by
+    the mean ratio (per keyword) of already stitched values to its own
+    values in the overlapping days and only its new days are added.
+    As the ratio is computed against already scaled values the factors
+    chain cumulatively.
+
+    All batches are placed on one date grid so the whole stitching
+    is a single pass over NumPy arrays.
+
+    :param list batches: Dataframes with ``date`` column and one column
+                         per keyword - newest search first.
+    :param list kw_list: List of search terms.
+    :return: Dataframe with ``date`` column and one column per keyword
+             sorted by date.
+    :rtype: pd.DataFrame
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    dates = [b["date"].values for b in batches]
+    values = [b[kw_list].values.astype(np.float64) for b in batches]
+
+    # Common date grid - positions of every batch row on the grid.
+    grid, positions = np.unique(np.concatenate(dates), return_inverse=True)
+    positions = np.split(positions.ravel(), np.cumsum([len(d) for d in dates])[:-1])
+
+    stitched = np.full((len(grid), len(kw_list)), np.nan)
+    filled = np.zeros(len(grid), dtype=bool)
+
+    stitched[positions[0]] = values[0]
+    filled[positions[0]] = True
+
+    for pos, vals in zip(positions[1:], values[1:]):
+        overlap = filled[pos]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = stitched[pos[overlap]] / vals[overlap]
+
+        # Mean of finite ratios only (zero values make them invalid).
+        valid = np.isfinite(ratios)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factors = np.where(valid, ratios, 0).sum(axis=0) / valid.sum(axis=0)
+
+        new = ~overlap
+        stitched[pos[new]] = vals[new] * factors
+        filled[pos[new]] = True
+
+    df = pd.DataFrame(stitched[filled], columns=kw_list)
+    df.insert(0, "date", grid[filled])
+
+    return df
+
+
+class HeadMetaParser(HTMLParser):
+    """
+    Incremental HTML parser which collects ``content`` of ``<meta>``
+    tags with the given ``property`` attributes. Only the document
+    head is of interest - once ``</head>`` or ``<body>`` is reached
+    ``done`` is set and the rest of the document can be skipped.
+    """
+
+    def __init__(self, properties):
+        """
+        Constructor.
+
+        :param tuple properties: Meta properties to collect (i.e. og:title).
+        """
+
+        super().__init__(convert_charrefs=True)
+        self.properties = properties
+        self.meta = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        if "meta" == tag:
+            attrs = dict(attrs)
+            property = attrs.get("property")
+
+            # First occurrence wins.
+            if (
+                property in self.properties
+                and property not in self.meta
+                and attrs.get("content") is not None
+            ):
+                self.meta[property] = attrs["content"]
+        elif "body" == tag:
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if "head" == tag:
+            self.done = True
+
+
+def parse_head_meta(data, encoding, properties):
+    """
+    Parses ``content`` of ``<meta>`` tags with the given ``property``
+    attributes from HTML head. Module level function so it can be run
+    in a process pool.
+
+    :param bytes data: HTML (head) data.
+    :param str encoding: Data encoding.
+    :param tuple properties: Meta properties to collect (i.e. og:title).
+    :return: Dict where keys are meta properties and values their content.
+    :rtype: dict
+    """
+
+    try:
+        html = data.decode(encoding, errors="replace")
+    except LookupError:
+        html = data.decode("utf-8", errors="replace")
+
+    parser = HeadMetaParser(properties)
+    parser.feed(html)
+
+    return parser.meta
+
+
+def parse_top_news(html):
+    """
+    Parses editors choice and hot stories from cointelegraph.com front page.
+    Module level function so it can be run in a process pool.
+
+    :param str html: Front page HTML.
+    :return: Tuple where first are editors choice news and second hot stories.
+    :rtype: tuple
+    """
+
+    from bs4 import BeautifulSoup
+
+    dom = BeautifulSoup(html, "lxml")
+
+    def parse_news(news_items):
+        """
+        Parse news URL from news LI HTML elements.
+
+        :param list news_items: List of LI HTML elements where A HTML elements sits.
+        :return: List of news dicts with "url" key.
+        :rtype: dict
+        """
+
+        news = []
+
+        for i in news_items:
+            try:
+                href = i.find("a")["href"]
+            except AttributeError:
+                # A without href attribute.
+                continue
+
+            if not href.startswith("https://"):
+                href = "https://cointelegraph.com" + href
+
+            news.append({"url": href})
+
+        return news
+
+    container = dom.find(class_="main-news-controls__list")
+    news = container.find_all("li")
+
+    return parse_news(news[:5]), parse_news(news[5:])
@@ -1,8 +1,30 @@
-from datetime import date, datetime, timedelta
-
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
 import pytest
 
-from karpet import Karpet
+from karpet import (
+    AsyncKarpet,
+    CircuitBreaker,
+    DiskCache,
+    HistoryStore,
+    Karpet,
+    MemoryCache,
+    NewsCache,
+    RateLimiter,
+    Stats,
+)
+from karpet.ratelimit import TokenBucket
+from karpet.search import CoinSearchIndex
+from karpet.utils import HeadMetaParser, date_to_timestamp, stitch_trend_batches
 
 CRYPTOCOMPARE_API_KEY = None
 
@@ -33,6 +55,89 @@ def test_fetch_crypto_historical_data_limited():
     assert 30 == len(c.fetch_crypto_historical_data(symbol="BTC"))
 
 
+def test_historical_data_range():
+    c = Karpet(date(2019, 1, 1), date(2019, 1, 30))
+    url, stored = c._get_historical_data_request("bitcoin")
+
+    assert stored is None
+    assert "/coins/bitcoin/market_chart/range?" in url
+    assert f"from={date_to_timestamp(date(2018, 12, 31))}" in url
+    assert f"to={date_to_timestamp(date(2019, 2, 1))}" in url
+
+    # Hourly data of the range with one day margin on both sides.
+    start = int(datetime(2018, 12, 31, tzinfo=timezone.utc).timestamp() * 1000)
+    points = [[start + h * 3600 * 1000, float(h)] for h in range(33 * 24)]
+    data = {"prices": points, "market_caps": points, "total_volumes": points}
+    df = c._get_historical_data_df("bitcoin", data)
+
+    assert 30 == len(df)
+    assert df.index.is_unique
+    assert pd.Timestamp("2019-01-01") == df.index[0]
+    assert pd.Timestamp("2019-01-30") == df.index[-1]
+
+    # Full history keeps the current price as the last row.
+    c = Karpet()
+    url, _ = c._get_historical_data_request("bitcoin")
+    day = 24 * 3600 * 1000
+    points = [[start, 1.0], [start + day, 2.0], [start + day + 3600 * 1000, 3.0]]
+    data = {"prices": points, "market_caps": points, "total_volumes": points}
+
+    assert url.endswith("/coins/bitcoin/market_chart?vs_currency=usd&days=max")
+    assert [1.0, 2.0, 3.0] == list(c._get_historical_data_df("bitcoin", data)["price"])
+
+
+def test_fetch_crypto_historical_data_store(tmp_path):
+    c = Karpet(store=HistoryStore(tmp_path))
+    df = c.fetch_crypto_historical_data(id="bitcoin")
+
+    assert (tmp_path / "bitcoin.npz").exists()
+
+    # Second call downloads just the missing tail.
+    df_2 = c.fetch_crypto_historical_data(id="bitcoin")
+
+    assert len(df) <= len(df_2)
+    assert df.index[0] == df_2.index[0]
+    assert df_2.index.is_unique
+
+
+def test_fetch_crypto_historical_data_many():
+    c = Karpet()
+    frames, errors = c.fetch_crypto_historical_data_many(
+        ids=["bitcoin", "ethereum", "nonexisting-coin-id"]
+    )
+
+    assert ["bitcoin", "ethereum"] == sorted(frames.keys())
+    assert 1000 < len(frames["bitcoin"])
+    assert ["nonexisting-coin-id"] == list(errors.keys())
+
+
+def test_fetch_crypto_historical_data_many_long_format():
+    c = Karpet(date(2019, 1, 1), date(2019, 1, 30))
+    df, errors = c.fetch_crypto_historical_data_many(
+        ids=["bitcoin", "ethereum"], long_format=True
+    )
+
+    assert 0 == len(errors)
+    assert 60 == len(df)
+    assert list(df.columns) == ["id", "price", "market_cap", "total_volume"]
+
+
+def test_fetch_crypto_historical_data_panel():
+    c = Karpet(date(2019, 1, 1), date(2019, 1, 30))
+    df, errors = c.fetch_crypto_historical_data_panel(
+        ids=["bitcoin", "ethereum", "nonexisting-coin-id"], dtype="float32"
+    )
+
+    assert ["nonexisting-coin-id"] == list(errors.keys())
+    assert 30 == len(df)
+    assert ["bitcoin", "ethereum"] == list(df["price"].columns)
+    assert ["price", "market_cap", "total_volume"] == list(
+        df.columns.get_level_values(0).unique()
+    )
+    assert (df.dtypes == "float32").all()
+    assert df["price"]["bitcoin"].notna().all()
+
+
 def test_fetch_exchanges():
     c = Karpet()
     exchanges = c.fetch_crypto_exchanges("btc")
@@ -41,6 +146,17 @@ def test_fetch_exchanges():
     assert "Binance" in exchanges
 
 
+def test_fetch_crypto_exchanges_many():
+    c = Karpet()
+    exchanges = c.fetch_crypto_exchanges_many(["btc", "ETH", "nonexisting-symbol"])
+
+    assert "Binance" in exchanges["btc"]
+    assert "Binance" in exchanges["ETH"]
+    assert [] == exchanges["nonexisting-symbol"]
+    assert "BTC" in c.fetch_exchange_symbols("Binance")
+    assert [] == c.fetch_exchange_symbols("nonexisting-exchange")
+
+
 def test_fetch_google_trends():
     c = Karpet(*get_last_week())
     df = c.fetch_google_trends(kw_list=["bitcoin"])
@@ -49,6 +165,19 @@ def test_fetch_google_trends():
     assert len(df[df["bitcoin"] == 100.0]) == 1
 
 
+def test_stitch_trend_batches():
+    dates = pd.date_range("2020-01-01", periods=10, freq="D")
+    series = np.arange(1, 11, dtype=float)
+
+    # Newest first, older batch has different scale.
+    newer = pd.DataFrame({"date": dates[4:], "bitcoin": series[4:]})
+    older = pd.DataFrame({"date": dates[:7], "bitcoin": series[:7] * 2})
+    df = stitch_trend_batches([newer, older], ["bitcoin"])
+
+    assert list(df["date"]) == list(dates)
+    assert np.allclose(df["bitcoin"].values, series)
+
+
 def test_fetch_news():
     k = Karpet()
     news = k.fetch_news("eth")
@@ -62,6 +191,175 @@ def test_fetch_news():
         assert isinstance(news[0]["date"], datetime)
 
 
+def test_head_meta_parser():
+    parser = HeadMetaParser(("og:title", "og:image"))
+    html = (
+        '<html><head><meta property="og:title" content="Title &amp; more">'
+        '<meta property="og:title" content="Second"></head>'
+        '<body><meta property="og:image" content="image.jpg">'
+    )
+
+    # Fed in small chunks as it comes from the network.
+    for i in range(0, len(html), 7):
+        parser.feed(html[i : i + 7])
+
+    assert parser.done
+    assert parser.meta == {"og:title": "Title & more"}
+
+
+def test_news_cache(tmp_path):
+    cache = NewsCache(tmp_path / "news.sqlite", max_entries=2)
+    published = datetime(2019, 7, 28, 9, 24, tzinfo=timezone(timedelta(hours=1)))
+    cache.set_many(
+        [
+            {"url": "a", "title": "A", "date": published},
+            {"url": "b", "title": "B", "date": None},
+        ]
+    )
+    cache.get_many(["a"])
+    cache.set_many([{"url": "c", "title": "C", "date": None}])
+
+    found = cache.get_many(["a", "b", "c"])
+
+    assert ["a", "c"] == sorted(found.keys())
+    assert published == found["a"]["date"]
+    assert "A" == found["a"]["title"]
+
+
+@pytest.fixture
+def news_server():
+    """
+    Local news site - page "/<seconds>/<n>" responds after the given
+    number of seconds, page "/429/<n>" is rate limited. Pages under
+    "/json/<seconds>/" are empty JSON lists responding after the given
+    number of seconds, the first page under "/flaky/" fails with HTTP 503
+    after 1s and the others hang. Tracks max number of news pages served
+    at once (pages taking 1s+ aren't counted as their clients may give up).
+    """
+
+    state = {"active": 0, "max_active": 0, "flaky": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/flaky/"):
+                with lock:
+                    state["flaky"] += 1
+                    first = 1 == state["flaky"]
+
+                time.sleep(1 if first else 5)
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+                return
+
+            if self.path.startswith("/json/"):
+                time.sleep(float(self.path.split("/")[2]))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"[]")
+
+                return
+
+            if self.path.startswith("/429/"):
+                body = b'<html><head><meta property="og:title" content="Slow down">'
+                self.send_response(429)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+                return
+
+            delay = float(self.path.split("/")[1])
+            counted = delay < 1
+
+            with lock:
+                state["active"] += counted
+                state["max_active"] = max(state["max_active"], state["active"])
+
+            try:
+                time.sleep(delay)
+                body = (
+                    '<html><head><meta property="og:title" content="News">'
+                    '<meta property="article:published_time" '
+                    'content="2019-07-28T09:24:00+01:00"></head><body>'
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:
+                # Client gave up.
+                pass
+            finally:
+                with lock:
+                    state["active"] -= counted
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield state
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_news_features_limits(news_server):
+    k = Karpet()
+    k.news_concurrency = 2
+    k.news_timeout = 0.5
+    k.news_deadline = 1.5
+
+    # The first one times out, the rest takes 2s in total with
+    # 2 concurrent requests - some don't make it by the deadline.
+    news = [{"url": f"{news_server['url']}/3/0"}]
+    news += [{"url": f"{news_server['url']}/0.4/{i}"} for i in range(1, 9)]
+
+    start = time.monotonic()
+    asyncio.run(k._fetch_news_features(news))
+
+    assert time.monotonic() - start < k.news_deadline + 0.5
+    assert 2 == news_server["max_active"]
+
+    for n in news:
+        assert {"title", "date", "image", "description"} <= n.keys()
+
+    titles = [n["title"] for n in news]
+
+    assert titles[0] is None
+    assert "News" in titles[1:]
+    assert None in titles[1:]
+
+    for n in news:
+        if n["title"] is None:
+            assert n["date"] is None
+            assert n["description"] is None
+        else:
+            assert isinstance(n["date"], datetime)
+
+
+def test_news_cache_skips_error_pages(news_server, tmp_path):
+    k = Karpet(news_cache=NewsCache(tmp_path / "news.sqlite"))
+    news = [
+        {"url": f"{news_server['url']}/429/0"},
+        {"url": f"{news_server['url']}/0/1"},
+    ]
+    asyncio.run(k._fetch_news_features(news))
+
+    assert news[0]["title"] is None
+    assert "News" == news[1]["title"]
+    assert [news[1]["url"]] == list(k.news_cache.get_many([n["url"] for n in news]))
+
+
 def test_fetch_news_with_limit():
     k = Karpet()
     news = k.fetch_news("eth", limit=30)
@@ -121,9 +419,470 @@ def test_get_coin_ids():
     assert k.get_coin_ids("BTC") == ["bitcoin"]
 
 
+def test_get_coin_ids_many():
+    k = Karpet()
+    ids = k.get_coin_ids_many(["BTC", "eth", "nonexisting-symbol"])
+
+    assert ids["BTC"] == ["bitcoin"]
+    assert "ethereum" in ids["eth"]
+    assert ids["nonexisting-symbol"] == []
+
+
+def test_search_coins():
+    k = Karpet()
+    coins = k.search_coins("bitc")
+
+    assert 0 < len(coins) <= 10
+    assert "BTC" == coins[0]["symbol"]
+    assert "BTC" == k.search_coins("btc", limit=1)[0]["symbol"]
+    assert "ETH" == k.search_coins("etherum", limit=1, fuzzy=True)[0]["symbol"]
+
+
+def test_coin_search_index():
+    index = CoinSearchIndex(
+        [
+            {"name": "Wrapped Bitcoin", "symbol": "WBTC", "rank": None},
+            {"name": "Bitcoin Cash", "symbol": "BCH", "rank": 20},
+            {"name": "Bitcoin", "symbol": "BTC", "rank": 1, "tokens": ["bitcoin"]},
+            {"name": "Shiba Inu", "symbol": "SHIB", "rank": 15, "slug": "shiba-inu"},
+        ]
+    )
+
+    def symbols(*args, **kwargs):
+        return [c["symbol"] for c in index.search(*args, **kwargs)]
+
+    assert ["BTC", "BCH", "WBTC"] == symbols("bitc")
+    assert ["BCH"] == symbols("bitcoin cash")
+    assert ["BTC"] == symbols("BTC ")
+    assert ["SHIB"] == symbols("inu")
+    assert ["BTC"] == symbols("bitc", limit=1)
+    assert [] == symbols("bitcion")
+    assert ["BTC", "BCH", "WBTC"] == symbols("bitcion", fuzzy=True)
+    assert ["SHIB"] == symbols("shbia", fuzzy=True)
+    assert [] == symbols("")
+
+
 def test_fetch_crypto_live_data():
     k = Karpet()
     df = k.fetch_crypto_live_data(id="ethereum")
 
     assert 0 < len(df)
     assert list(df.columns) == ["open", "high", "low", "close"]
+
+
+def test_stream_crypto_live_data():
+    k = Karpet()
+    stream = k.stream_crypto_live_data(
+        ids=["bitcoin", "ethereum", "nonexisting-coin-id"]
+    )
+    df, errors = next(stream)
+    stream.close()
+
+    assert ["nonexisting-coin-id"] == list(errors.keys())
+    assert list(df.columns) == ["id", "open", "high", "low", "close"]
+    assert ["bitcoin", "ethereum"] == sorted(df["id"].unique())
+
+
+def test_ohlc_delta():
+    k = Karpet()
+    data = [[1, 1.0, 2.0, 0.5, 1.5], [2, 1.5, 2.0, 1.0, 1.8]]
+
+    assert data == k._get_ohlc_delta(data)
+    assert [] == k._get_ohlc_delta(data, data[-1])
+    assert data[1:] == k._get_ohlc_delta(data, data[0])
+
+    # Updated last candle.
+    assert data[1:] == k._get_ohlc_delta(data, [2, 1.5, 2.0, 1.0, 1.7])
+
+
+def test_async_karpet():
+    async def run():
+        async with AsyncKarpet() as k:
+            return await asyncio.gather(
+                k.fetch_crypto_historical_data(id="bitcoin"),
+                k.fetch_crypto_live_data(id="ethereum"),
+                k.fetch_crypto_exchanges("btc"),
+                k.get_coin_ids("BTC"),
+                k.get_basic_info(id="ethereum"),
+            )
+
+    historical, live, exchanges, ids, basic_info = asyncio.run(run())
+
+    assert 1000 < len(historical)
+    assert list(live.columns) == ["open", "high", "low", "close"]
+    assert "Binance" in exchanges
+    assert ids == ["bitcoin"]
+    assert isinstance(basic_info["name"], str)
+
+
+def test_async_karpet_fetch_news():
+    async def run():
+        async with AsyncKarpet() as k:
+            return await k.fetch_news("eth")
+
+    news = asyncio.run(run())
+
+    assert len(news) > 0
+    assert "title" in news[0]
+
+
+@pytest.mark.parametrize("cache_class", [MemoryCache, DiskCache])
+def test_cache_eviction(cache_class, tmp_path):
+    if cache_class is DiskCache:
+        cache = cache_class(tmp_path, max_entries=2)
+    else:
+        cache = cache_class(max_entries=2)
+
+    cache.set("a", {"data": 1})
+    cache.set("b", {"data": 2})
+    cache.get("a")
+    cache.set("c", {"data": 3})
+
+    assert cache.get("a") == {"data": 1}
+    assert cache.get("c") == {"data": 3}
+
+
+@pytest.mark.parametrize("cache_class", [MemoryCache, DiskCache])
+def test_cache_byte_budget(cache_class, tmp_path):
+    if cache_class is DiskCache:
+        cache = cache_class(tmp_path, max_bytes=2500)
+    else:
+        cache = cache_class(max_bytes=2500)
+
+    entry = {"data": "x" * 1000, "size": 1000}
+    cache.set("a", entry)
+    cache.set("b", entry)
+    cache.get("a")
+    cache.set("c", entry)
+
+    assert cache.get("a") == entry
+    assert cache.get("b") is None
+    assert cache.get("c") == entry
+
+    # Too big entry is not cached and doesn't evict others.
+    cache.set("d", {"data": "x" * 3000, "size": 3000})
+
+    assert cache.get("d") is None
+    assert cache.get("a") == entry
+
+    if cache_class is DiskCache:
+        assert 2 == len(cache_class(tmp_path, max_bytes=2500)._files)
+
+
+def test_cached_get_basic_info():
+    k = Karpet(cache=MemoryCache())
+    data = k.get_basic_info(id="ethereum")
+
+    assert data == k.get_basic_info(id="ethereum")
+
+
+def test_get_basic_info_many():
+    k = Karpet()
+    data = k.get_basic_info_many(top=300)
+
+    assert 300 == len(data)
+    assert "bitcoin" in data
+    assert isinstance(data["bitcoin"]["current_price"], float)
+    assert 1 == data["bitcoin"]["rank"]
+
+    data = k.get_basic_info_many(ids=["bitcoin", "ethereum"])
+
+    assert {"bitcoin", "ethereum"} == set(data)
+
+
+def test_base_urls():
+    k = Karpet()
+    k.base_urls = {"api.coingecko.com": "http://127.0.0.1:8000/api.coingecko.com/"}
+
+    assert (
+        "http://127.0.0.1:8000/api.coingecko.com/api/v3/coins/list?x=1"
+        == k._get_url("https://api.coingecko.com/api/v3/coins/list?x=1")
+    )
+    assert "https://coincodex.com/api/" == k._get_url("https://coincodex.com/api/")
+
+
+def test_stats():
+    stats = Stats(latency_buckets=(0.1, 1))
+    stats.on_request("coin", 0.05, 100)
+    stats.on_request("coin", 0.5, 200)
+    stats.on_request("coin", 5, 300)
+    stats.on_retry("coin")
+    stats.on_backoff("coin", 1.5)
+    stats.on_cache("coin", "hit")
+    stats.on_parse("coin", 0.01)
+    coin = stats.snapshot()["coin"]
+
+    assert 3 == coin["requests"]
+    assert 600 == coin["bytes"]
+    assert {0.1: 1, 1: 2, float("inf"): 3} == coin["latency_histogram"]
+    assert 1 == coin["retries"]
+    assert 1.5 == coin["backoff_time"]
+    assert 1 == coin["cache_hit"]
+    assert 1 == coin["parse_count"]
+
+    stats.reset()
+
+    assert {} == stats.snapshot()
+
+
+def test_get_basic_info_stats():
+    stats = Stats()
+    k = Karpet(stats=stats)
+    k.get_basic_info(id="ethereum")
+    snapshot = stats.snapshot()
+
+    assert 1 == snapshot["coin"]["requests"]
+    assert 1 == snapshot["market_chart"]["requests"]
+    assert 0 < snapshot["market_chart"]["bytes"]
+
+
+def test_lazy_imports():
+    # Fresh interpreter - the modules may be already imported here.
+    script = (
+        "import sys, karpet; karpet.Karpet(); "
+        "print(','.join(sorted(m for m in ('aiohttp', 'asyncio', 'bs4', 'numpy', "
+        "'pandas', 'pytrends', 'requests') if m in sys.modules)))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+
+    assert "" == output.strip()
+
+
+def test_map():
+    k = Karpet()
+    data, errors = k.map(
+        "fetch_crypto_live_data", ids=["bitcoin", "ethereum", "nonexistent-coin"]
+    )
+
+    assert {"bitcoin", "ethereum"} == set(data)
+    assert isinstance(data["bitcoin"], pd.DataFrame)
+    assert ["nonexistent-coin"] == list(errors)
+
+
+def test_coalesced_requests():
+    stats = Stats()
+    k = Karpet(stats=stats)
+    url = "https://api.coingecko.com/api/v3/coins/list"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(k._get_json, [url] * 8))
+
+    assert all(r is results[0] for r in results)
+    assert 1 == stats.snapshot()["coin_list"]["requests"]
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+
+    for _ in range(12):
+        bucket.acquire()
+
+    # 2 requests at once, then 10 requests at 20 req/s.
+    assert 0.45 < time.monotonic() - start < 1
+
+
+def test_token_bucket_max_wait():
+    bucket = TokenBucket(rate=0.2, burst=1)
+
+    assert bucket.acquire(max_wait=0)
+
+    # Waiting 5s for the next token doesn't fit - the token is not taken.
+    start = time.monotonic()
+
+    assert not bucket.acquire(max_wait=1)
+    assert time.monotonic() - start < 0.1
+    assert 4.5 < bucket.reserve() <= 5
+
+
+def test_rate_limiter_unknown_host():
+    limiter = RateLimiter({"api.coingecko.com": (0.001, 1)})
+    start = time.monotonic()
+
+    for _ in range(5):
+        limiter.acquire("https://example.com/")
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_rate_limiter_base_urls(news_server):
+    k = Karpet(rate_limiter=RateLimiter({"api.coingecko.com": (10, 1)}))
+    k.base_urls = {"api.coingecko.com": f"{news_server['url']}/json/0"}
+    start = time.monotonic()
+
+    # Requests sent to the base URL are limited by the original host.
+    for _ in range(3):
+        assert [] == k._get_json("https://api.coingecko.com/api/v3/coins/list")
+
+    assert time.monotonic() - start >= 0.19
+
+
+def test_coin_ids_index_publication():
+    k = Karpet()
+    index = k._set_coin_ids_index([{"symbol": "btc", "id": "bitcoin"}])
+
+    try:
+        # Build time is published together with the index.
+        assert Karpet._coin_ids_index[1] is index
+        assert k._get_fresh_coin_ids_index() is index
+        assert ["bitcoin"] == k.get_coin_ids("BTC")
+
+        k.coin_ids_ttl = -1
+
+        assert k._get_fresh_coin_ids_index() is None
+    finally:
+        Karpet._coin_ids_index = None
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    url = "https://api.coingecko.com/api/v3/coins/list"
+
+    breaker.record_failure(url)
+    assert breaker.allow(url)
+
+    breaker.record_failure(url)
+    assert not breaker.allow(url)
+    assert breaker.allow("https://example.com/")
+
+    # One trial request after reset timeout.
+    time.sleep(0.25)
+    assert breaker.allow(url)
+    assert not breaker.allow(url)
+
+    breaker.record_success(url)
+    assert breaker.allow(url)
+    assert not breaker.is_open(url)
+
+
+def test_deadline():
+    k = Karpet()
+    start = time.monotonic()
+
+    with pytest.raises(Exception):
+        with k.deadline(0):
+            k.fetch_crypto_live_data(id="bitcoin")
+
+    assert time.monotonic() - start < 0.1
+    assert k._get_remaining() is None
+    assert 5 == k._get_retry_after({"Retry-After": "5"})
+    assert k._get_retry_after({}) is None
+
+
+def test_deadline_retries(news_server):
+    k = Karpet(circuit_breaker=CircuitBreaker())
+    k.req_backoff_factor = 0.1
+    k.base_urls = {"api.coingecko.com": f"{news_server['url']}/flaky"}
+    start = time.monotonic()
+
+    # The retry hangs - it's cut by the deadline.
+    with pytest.raises(Exception):
+        with k.deadline(2):
+            k._get_json("https://api.coingecko.com/api/v3/coins/list")
+
+    assert 2 == news_server["flaky"]
+    assert time.monotonic() - start < 2.4
+
+
+def test_deadline_coalesced_requests(news_server):
+    k = Karpet(circuit_breaker=CircuitBreaker())
+    k.base_urls = {"api.coingecko.com": f"{news_server['url']}/json/1"}
+    url = "https://api.coingecko.com/api/v3/coins/list"
+
+    def get_json(seconds):
+        with k.deadline(seconds):
+            return k._get_json(url)
+
+    # The second caller joins the download of the first one - it doesn't
+    # take over the failure caused by the shorter deadline.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        short = executor.submit(get_json, 0.3)
+        time.sleep(0.1)
+        long = executor.submit(get_json, None)
+
+        with pytest.raises(Exception):
+            short.result()
+
+        assert [] == long.result()
+
+    async def get_json_async(k, seconds):
+        with k.deadline(seconds):
+            return await k._get_json_async(k._get_aio_session(), url)
+
+    async def run():
+        async with AsyncKarpet(circuit_breaker=k.circuit_breaker) as ak:
+            ak.base_urls = k.base_urls
+
+            return await asyncio.gather(
+                get_json_async(ak, 0.3),
+                get_json_async(ak, None),
+                return_exceptions=True,
+            )
+
+    short, long = asyncio.run(run())
+
+    assert isinstance(short, Exception)
+    assert [] == long
+
+
+def test_stream_crypto_live_data_deadline(news_server):
+    k = Karpet(circuit_breaker=CircuitBreaker())
+    k.base_urls = {"api.coingecko.com": f"{news_server['url']}/json/1"}
+    stream = k.stream_crypto_live_data(ids=["bitcoin"], interval=0.1)
+    start = time.monotonic()
+
+    # Polls in worker threads keep the deadline.
+    with k.deadline(0.3):
+        _, errors = next(stream)
+
+    stream.close()
+
+    assert ["bitcoin"] == list(errors)
+    assert time.monotonic() - start < 0.8
+
+
+def test_stream_crypto_live_data_unresolved():
+    k = Karpet()
+    k._set_coin_ids_index([{"symbol": "btc", "id": "bitcoin"}])
+
+    async def run():
+        async with AsyncKarpet() as ak:
+            return [p async for p in ak.stream_crypto_live_data(symbols=["NOPE"])]
+
+    try:
+        # Errors are yielded once and there is nothing to poll then.
+        sync_polls = list(k.stream_crypto_live_data(symbols=["NOPE"]))
+
+        for polls in (sync_polls, asyncio.run(run())):
+            assert 1 == len(polls)
+            assert ["NOPE"] == list(polls[0][1])
+    finally:
+        Karpet._coin_ids_index = None
+
+
+def test_deadline_rate_limiter(news_server):
+    k = Karpet(rate_limiter=RateLimiter({"api.coingecko.com": (0.2, 1)}))
+    k.base_urls = {"api.coingecko.com": f"{news_server['url']}/json/0"}
+    url = "https://api.coingecko.com/api/v3/coins/list"
+    k._get_json(url)
+
+    # The next token comes in 5s - fail fast instead of waiting.
+    start = time.monotonic()
+
+    with pytest.raises(Exception):
+        with k.deadline(1):
+            k._get_json(url)
+
+    async def run():
+        async with AsyncKarpet(rate_limiter=k.rate_limiter) as ak:
+            ak.base_urls = k.base_urls
+
+            with ak.deadline(1):
+                await ak._get_json_async(ak._get_aio_session(), url)
+
+    with pytest.raises(Exception):
+        asyncio.run(run())
+
+    assert time.monotonic() - start < 0.5